@@ -0,0 +1 @@
+"""可复现的性能基准测试，用法见 ``python -m benchmarks --help``。"""
@@ -0,0 +1,216 @@
+"""运行基准测试。
+
+在仓库根目录执行::
+
+    python -m benchmarks --size small --repeat 3 --output before.json
+    python -m benchmarks --size small --repeat 3 --compare before.json
+
+每个用例的每次运行都在独立的子进程中进行，以便测量峰值内存，
+并避免前一个用例的缓存和内存占用影响后一个用例。
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .fixtures import SEED, SIZES
+
+#: 修改输入文件的生成方式时递增，使旧的缓存失效
+FIXTURE_VERSION = 1
+CACHE_DIR = Path(tempfile.gettempdir()) / 'pytools-benchmarks'
+
+
+def _peak_rss() -> tuple[Optional[float], Optional[float]]:
+    """本进程和已结束的子进程的峰值内存（MiB）。"""
+
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # Linux 下单位为 KiB，macOS 下为字节
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return tuple(
+        resource.getrusage(who).ru_maxrss * unit / 1024 ** 2
+        for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+    )
+
+
+def _run_child(case: str, size: str, inputs: Path) -> dict[str, Any]:
+    """在子进程中执行一次用例。"""
+
+    from src.pytools.metrics import metrics
+
+    from .cases import CASES
+
+    stages: dict[str, float] = {}
+
+    def collect(event: dict[str, Any]) -> None:
+        if event['event'] == 'done':
+            for stage, seconds in event['stages'].items():
+                key = f"{event['type']}.{stage}"
+                stages[key] = stages.get(key, 0.0) + seconds
+    metrics.subscribe(collect)
+    with tempfile.TemporaryDirectory(prefix='pytools-bench-') as out:
+        start = time.perf_counter()
+        items, unit = asyncio.run(CASES[case](inputs, Path(out), SIZES[size]))
+        seconds = time.perf_counter() - start
+    # 进程池关闭时不等待子进程退出，先回收子进程才能统计到它们的内存
+    for child in multiprocessing.active_children():
+        child.join(timeout=30)
+    rss, children_rss = _peak_rss()
+    return {
+        'seconds': seconds,
+        'items': items,
+        'unit': unit,
+        'peak_rss_mb': rss,
+        'peak_children_rss_mb': children_rss,
+        'stages': stages,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta(size: str) -> dict[str, Any]:
+    from importlib import metadata
+
+    versions = {}
+    for dist in ('pymupdf', 'pdf2docx', 'Pillow', 'aiohttp'):
+        try:
+            versions[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            versions[dist] = None
+    return {
+        'commit': _git_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'size': size,
+        'sizes': SIZES[size]._asdict(),
+        'seed': SEED,
+        'fixture_version': FIXTURE_VERSION,
+        'packages': versions,
+    }
+
+
+def _summarize(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    median = statistics.median(run['seconds'] for run in runs)
+    items = runs[0]['items']
+
+    def peak(key: str) -> Optional[float]:
+        values = [run[key] for run in runs if run[key] is not None]
+        return round(max(values), 1) if values else None
+    return {
+        'items': items,
+        'unit': runs[0]['unit'],
+        'seconds': [round(run['seconds'], 4) for run in runs],
+        'median_seconds': round(median, 4),
+        'throughput': round(items / median, 3),
+        'peak_rss_mb': peak('peak_rss_mb'),
+        'peak_children_rss_mb': peak('peak_children_rss_mb'),
+        'stages': {
+            stage: round(statistics.median(
+                run['stages'].get(stage, 0.0) for run in runs
+            ), 4)
+            for stage in runs[0]['stages']
+        },
+    }
+
+
+def _compare(results: dict[str, Any], baseline: dict[str, Any]) -> None:
+    if baseline['meta'].get('size') != results['meta']['size']:
+        print('warning: baseline was run with a different size', file=sys.stderr)
+    print(f"{'case':<12} {'baseline':>12} {'current':>12} {'change':>8}")
+    for case, result in results['results'].items():
+        base = baseline['results'].get(case)
+        if base is None:
+            continue
+        change = result['median_seconds'] / base['median_seconds'] - 1
+        print(
+            f"{case:<12} {base['median_seconds']:>11.3f}s "
+            f"{result['median_seconds']:>11.3f}s {change:>+8.1%}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from .cases import CASES
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('cases', nargs='*', metavar='case',
+                        help=f"cases to run, default all of {', '.join(CASES)}")
+    parser.add_argument('--size', choices=tuple(SIZES), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='baseline JSON to compare with')
+    parser.add_argument('--cache', default=str(CACHE_DIR),
+                        help='directory of generated inputs')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    inputs = Path(args.cache) / f'{args.size}-v{FIXTURE_VERSION}'
+    if args.child:
+        print(json.dumps(_run_child(args.child, args.size, inputs)))
+        return 0
+
+    from .fixtures import generate
+
+    if not (inputs / '.complete').exists():
+        print(f'generating {args.size} inputs in {inputs}', file=sys.stderr)
+        shutil.rmtree(inputs, ignore_errors=True)
+        generate(inputs, SIZES[args.size])
+    env = dict(os.environ, PYTOOLS_LOG_LEVEL='WARNING')
+    results: dict[str, Any] = {'meta': _meta(args.size), 'results': {}}
+    for case in args.cases or CASES:
+        runs = []
+        for _ in range(args.repeat):
+            proc = subprocess.run(
+                [sys.executable, '-m', 'benchmarks', '--size', args.size,
+                 '--cache', args.cache, '--child', case],
+                capture_output=True, text=True, env=env,
+            )
+            if proc.returncode:
+                sys.stderr.write(proc.stderr)
+                print(f'{case} failed', file=sys.stderr)
+                return 1
+            runs.append(json.loads(proc.stdout.splitlines()[-1]))
+        summary = results['results'][case] = _summarize(runs)
+        print(
+            f"{case:<12} {summary['median_seconds']:>8.3f}s "
+            f"{summary['throughput']:>9.2f} {summary['unit']}/s "
+            f"rss {summary['peak_rss_mb']} MiB "
+            f"(workers {summary['peak_children_rss_mb']} MiB)",
+            file=sys.stderr,
+        )
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        _compare(results, json.loads(Path(args.compare).read_text()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""基准测试用例。
+
+每个用例是一个协程函数，接收输入目录、输出目录和规模，
+返回处理的项数和项的单位。
+"""
+import asyncio
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from src.pytools.OCR import PreprocessProfile
+from src.pytools.transform import (
+    FakeBackend,
+    Transformer,
+    TransformType,
+    img2pdf,
+    pdf2docx,
+    pdf2img,
+)
+
+from .fixtures import Size
+from .server import StandInRecognizer, StandInServer
+
+Case = Callable[[Path, Path, Size], Awaitable[tuple[int, str]]]
+
+#: 识别服务替身的延迟和 Recognizer 的并发量
+OCR_LATENCY = 0.05
+OCR_CONCURRENCY = 4
+#: FakeBackend 每个文件的转换耗时
+DOCX2PDF_DELAY = 0.01
+
+
+async def bench_pdf2img(inputs: Path, out: Path, size: Size) -> tuple[int, str]:
+    await pdf2img(inputs / 'document.pdf', out, dpi=150, resume=False)
+    return size.pages, 'pages'
+
+
+async def bench_pdf2docx(inputs: Path, out: Path, size: Size) -> tuple[int, str]:
+    await pdf2docx(inputs / 'docx_source.pdf', out, use_cache=False)
+    return size.docx_pages, 'pages'
+
+
+async def bench_img2pdf(inputs: Path, out: Path, size: Size) -> tuple[int, str]:
+    await img2pdf(inputs / 'images', out)
+    return size.images, 'images'
+
+
+async def bench_transformer(
+    inputs: Path,
+    out: Path,
+    size: Size,
+) -> tuple[int, str]:
+    """调度大量 docx2pdf 任务和一个 pdf2img 任务，测量调度和后端池的开销。"""
+
+    transformer = Transformer(
+        docx_backend=lambda: FakeBackend(DOCX2PDF_DELAY),
+        docx_workers=2,
+    )
+    try:
+        jobs = [
+            transformer.submit(docx_file, out, TransformType.DOCX2PDF)
+            for docx_file in sorted((inputs / 'docx').glob('*.docx'))
+        ]
+        jobs.append(transformer.submit(
+            inputs / 'document.pdf', out, TransformType.PDF2IMG,
+            resume=False,
+        ))
+        await asyncio.gather(*(job.future for job in jobs))
+    finally:
+        await transformer.exit()
+    return len(jobs), 'jobs'
+
+
+async def bench_ocr(inputs: Path, out: Path, size: Size) -> tuple[int, str]:
+    server = StandInServer(OCR_LATENCY)
+    await server.start()
+    recognizer = StandInRecognizer(server, concurrency=OCR_CONCURRENCY)
+    try:
+        result = await recognizer.recognize(
+            sorted((inputs / 'ocr').glob('*.png'))
+        )
+    finally:
+        await recognizer.exit()
+        await server.stop()
+    return len(result), 'images'
+
+
+async def bench_ocr_preprocess(
+    inputs: Path,
+    out: Path,
+    size: Size,
+) -> tuple[int, str]:
+    """上传前预处理图片，与 ocr 用例对比上传量减小后的效果。"""
+
+    server = StandInServer(OCR_LATENCY)
+    await server.start()
+    recognizer = StandInRecognizer(
+        server,
+        concurrency=OCR_CONCURRENCY,
+        preprocess=PreprocessProfile(),
+    )
+    try:
+        result = await recognizer.recognize(
+            sorted((inputs / 'ocr').glob('*.png'))
+        )
+    finally:
+        await recognizer.exit()
+        await server.stop()
+    return len(result), 'images'
+
+
+async def bench_ocr_throttled(
+    inputs: Path,
+    out: Path,
+    size: Size,
+) -> tuple[int, str]:
+    """服务端只允许较低的并发量，测量自适应并发的收敛效果。"""
+
+    server = StandInServer(OCR_LATENCY, qps_limit=OCR_CONCURRENCY)
+    await server.start()
+    recognizer = StandInRecognizer(server, concurrency=OCR_CONCURRENCY * 4)
+    try:
+        result = await recognizer.recognize(
+            sorted((inputs / 'ocr').glob('*.png'))
+        )
+    finally:
+        await recognizer.exit()
+        await server.stop()
+    return len(result), 'images'
+
+
+async def bench_ocr_pdf(inputs: Path, out: Path, size: Size) -> tuple[int, str]:
+    server = StandInServer(OCR_LATENCY)
+    await server.start()
+    recognizer = StandInRecognizer(server, concurrency=OCR_CONCURRENCY)
+    try:
+        result = await recognizer.recognize_pdf(inputs / 'document.pdf')
+    finally:
+        await recognizer.exit()
+        await server.stop()
+    return len(result), 'pages'
+
+
+CASES: dict[str, Case] = {
+    'pdf2img': bench_pdf2img,
+    'pdf2docx': bench_pdf2docx,
+    'img2pdf': bench_img2pdf,
+    'transformer': bench_transformer,
+    'ocr': bench_ocr,
+    'ocr_preprocess': bench_ocr_preprocess,
+    'ocr_throttled': bench_ocr_throttled,
+    'ocr_pdf': bench_ocr_pdf,
+}
@@ -0,0 +1,180 @@
+"""生成基准测试用的输入文件。
+
+所有内容都由固定的随机种子生成，同一规模在任何机器上生成的文件都相同，
+因此不同提交的结果可以直接比较。
+"""
+import random
+import zipfile
+from pathlib import Path
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+SEED = 20240501
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod '
+    'tempor incididunt ut labore et dolore magna aliqua ut enim ad minim '
+    'veniam quis nostrud exercitation ullamco laboris nisi aliquip ex ea '
+    'commodo consequat duis aute irure in reprehenderit voluptate velit'
+).split()
+
+
+class Size(NamedTuple):
+    """一种规模下各类输入的数量。"""
+
+    #: pdf2img 和 OCR 渲染使用的 PDF 页数
+    pages: int
+    #: pdf2docx 使用的 PDF 页数，pdf2docx 比渲染慢得多
+    docx_pages: int
+    #: img2pdf 的图片数
+    images: int
+    #: 图片的像素尺寸
+    image_size: tuple[int, int]
+    #: 提交给 Transformer 的 Word 文件数
+    docx_files: int
+    #: 发送给识别服务的图片数
+    ocr_images: int
+
+
+SIZES = {
+    'small': Size(8, 4, 8, (827, 1169), 16, 16),
+    'medium': Size(48, 16, 32, (1654, 2339), 64, 64),
+    'large': Size(192, 48, 96, (2480, 3508), 256, 256),
+}
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def make_image(path: Path, size: tuple[int, int], seed: int) -> None:
+    """生成一张类似扫描文档的图片：白底、文字行和一块照片区域。"""
+
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    width, height = size
+    img = Image.new('RGB', size, (250, 250, 248))
+    draw = ImageDraw.Draw(img)
+    margin = width // 12
+    line = max(height // 60, 8)
+    y = margin
+    while y < height - margin:
+        if rng.random() < 0.1:
+            # 照片或插图
+            box_height = min(rng.randint(5, 15) * line, height - margin - y)
+            for row in range(y, y + box_height, 4):
+                shade = rng.randint(60, 200)
+                draw.rectangle(
+                    (margin, row, width - margin, row + 3),
+                    fill=(shade, shade - 20, shade - 40),
+                )
+            y += box_height + line
+            continue
+        x = margin
+        while x < width - margin:
+            word = rng.randint(line, line * 5)
+            draw.rectangle(
+                (x, y, min(x + word, width - margin), y + line * 2 // 3),
+                fill=(30, 30, 30),
+            )
+            x += word + line // 2
+        y += line * 3 // 2
+    img.save(path)
+
+
+def make_pdf(path: Path, pages: int, seed: int) -> None:
+    """生成包含文字、表格和图片的 PDF。"""
+
+    import fitz
+
+    rng = random.Random(seed)
+    image = path.with_suffix('.png')
+    make_image(image, (600, 400), seed)
+    pdf = fitz.open()
+    for index in range(pages):
+        page = pdf.new_page(width=595, height=842)
+        page.insert_text((72, 72), f'Chapter {index + 1}', fontsize=20)
+        text = '\n'.join(_sentence(rng, rng.randint(8, 14)) for _ in range(12))
+        page.insert_textbox(fitz.Rect(72, 100, 523, 400), text, fontsize=10)
+        if index % 2:
+            page.insert_image(fitz.Rect(72, 420, 523, 720), filename=str(image))
+        else:
+            # 简单的表格
+            for row in range(8):
+                for col in range(4):
+                    rect = fitz.Rect(
+                        72 + col * 112, 420 + row * 30,
+                        184 + col * 112, 450 + row * 30,
+                    )
+                    page.draw_rect(rect, color=(0, 0, 0), width=0.5)
+                    page.insert_textbox(
+                        rect + (4, 8, -4, 0), rng.choice(WORDS), fontsize=9
+                    )
+    pdf.save(path, garbage=3, deflate=True)
+    pdf.close()
+    image.unlink()
+
+
+def make_docx(path: Path, paragraphs: int, seed: int) -> None:
+    """生成一个只有文字段落的最小 Word 文件。"""
+
+    rng = random.Random(seed)
+    body = ''.join(
+        f'<w:p><w:r><w:t>{escape(_sentence(rng, rng.randint(10, 30)))}'
+        '</w:t></w:r></w:p>'
+        for _ in range(paragraphs)
+    )
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+            'content-types"><Default Extension="rels" ContentType="'
+            'application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="'
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.'
+            'document.main+xml"/></Types>'
+        ))
+        docx.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+            '2006/relationships"><Relationship Id="rId1" Type="http://'
+            'schemas.openxmlformats.org/officeDocument/2006/relationships/'
+            'officeDocument" Target="word/document.xml"/></Relationships>'
+        ))
+        docx.writestr('word/document.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+            f'wordprocessingml/2006/main"><w:body>{body}</w:body></w:document>'
+        ))
+
+
+def generate(root: Path, size: Size) -> Path:
+    """生成一种规模的全部输入，已经生成过的直接复用。
+
+    :param root: 输入文件的保存目录
+    :param size: 规模
+    :return: ``root``
+    """
+
+    done = root / '.complete'
+    if done.exists():
+        return root
+    root.mkdir(parents=True, exist_ok=True)
+    make_pdf(root / 'document.pdf', size.pages, SEED)
+    make_pdf(root / 'docx_source.pdf', size.docx_pages, SEED + 1)
+    images = root / 'images'
+    images.mkdir(exist_ok=True)
+    for i in range(size.images):
+        make_image(images / f'scan_{i + 1}.png', size.image_size, SEED + i)
+    docx_dir = root / 'docx'
+    docx_dir.mkdir(exist_ok=True)
+    for i in range(size.docx_files):
+        make_docx(docx_dir / f'report_{i + 1}.docx', 50, SEED + i)
+    ocr = root / 'ocr'
+    ocr.mkdir(exist_ok=True)
+    for i in range(size.ocr_images):
+        make_image(ocr / f'shot_{i + 1}.png', (800, 600), SEED + i)
+    done.touch()
+    return root
@@ -0,0 +1,119 @@
+"""本地运行的文字识别服务替身。
+
+接口与百度文字识别的 token 和 general_basic 接口兼容，按固定延迟返回结果，
+用于在不访问网络的情况下测量 :class:`Recognizer` 自身的开销。
+"""
+import asyncio
+from typing import Optional
+
+from aiohttp import web
+
+from src.pytools.OCR import PreprocessProfile, Recognizer
+
+
+class StandInServer:
+    """识别服务替身。"""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        qps_limit: Optional[int] = None,
+        token_lifetime: float = 2592000,
+    ) -> None:
+        """初始化。
+
+        :param latency: 每个识别请求的服务端耗时（秒）
+        :param qps_limit: 同时处理的请求数上限，超出时返回 QPS 超限错误
+        :param token_lifetime: 颁发的 token 的有效期（秒）
+        """
+
+        self.latency = latency
+        self.qps_limit = qps_limit
+        self.token_lifetime = token_lifetime
+        self.requests = 0
+        self.bytes_received = 0
+        #: 没有 Content-Length 或长度与请求体不符的请求数
+        self.unsized = 0
+        self.tokens = 0
+        self.throttled = 0
+        self.max_concurrency = 0
+        self._running = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ''
+
+    async def _token(self, request: web.Request) -> web.Response:
+        self.tokens += 1
+        return web.json_response({
+            'access_token': f'stand-in-token-{self.tokens}',
+            'expires_in': self.token_lifetime,
+        })
+
+    async def _ocr(self, request: web.Request) -> web.Response:
+        if self.qps_limit is not None and self._running >= self.qps_limit:
+            self.throttled += 1
+            return web.json_response({
+                'error_code': 18,
+                'error_msg': 'Open api qps request limit reached',
+            })
+        self._running += 1
+        self.max_concurrency = max(self.max_concurrency, self._running)
+        try:
+            body = await request.read()
+            if request.content_length != len(body):
+                self.unsized += 1
+            form = await request.post()
+            image = form.get('image') or form.get('pdf_file') or ''
+            self.bytes_received += len(image)
+            await asyncio.sleep(self.latency)
+        finally:
+            self._running -= 1
+        self.requests += 1
+        return web.json_response({
+            'log_id': self.requests,
+            'words_result_num': 1,
+            'words_result': [{'words': f'{len(image)} characters'}],
+        })
+
+    async def start(self) -> None:
+        app = web.Application(client_max_size=64 * 1024 ** 2)
+        app.router.add_post('/oauth/2.0/token', self._token)
+        app.router.add_post('/ocr', self._ocr)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f'http://{host}:{port}'
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class StandInRecognizer(Recognizer):
+    """连接到识别服务替身的 Recognizer。
+
+    不读取本机的密钥配置，也不使用结果缓存和 token 缓存文件。
+    """
+
+    TOKEN_PATH = None
+
+    def __init__(
+        self,
+        server: StandInServer,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        *,
+        concurrency: int = 2,
+        preprocess: Optional[PreprocessProfile] = None,
+    ) -> None:
+        self.URL = f'{server.base_url}/ocr'
+        self.TOKEN_URL = f'{server.base_url}/oauth/2.0/token'
+        super().__init__(
+            loop,
+            concurrency=concurrency,
+            use_cache=False,
+            preprocess=preprocess,
+        )
+
+    async def _load_api_keys(self) -> tuple:
+        return 'stand-in-key', 'stand-in-secret'
@@ -1 +1,4 @@
-from .core import Recognizer
+from .cache import ResultCache
+from .core import OCRError, Recognizer
+from .limiter import AdaptiveLimiter
+from .preprocess import PreprocessProfile
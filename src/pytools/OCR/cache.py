@@ -0,0 +1,161 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from ..logging import logger
+from ..types import AnyPath, ReadableBuffer
+
+
+class ResultCache:
+    """文字识别结果的磁盘缓存。
+
+    以图片内容、接口地址和请求参数的摘要为键，识别过的图片不再上传。
+    超过 ``ttl`` 的结果视为过期；总大小超过 ``max_bytes`` 时按最近访问
+    时间淘汰最久未使用的结果。
+
+    数据库连接可以在多个线程中使用，``get``、``put`` 和 ``evict``
+    相互之间是串行的。
+    """
+
+    DEFAULT_PATH = Path.home() / '.cache/pytools/ocr.db'
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS results (
+        key TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created REAL NOT NULL,
+        accessed REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+    '''
+
+    def __init__(
+        self,
+        path: Optional[AnyPath] = None,
+        *,
+        max_bytes: int = 64 * 1024 ** 2,
+        ttl: Optional[float] = 30 * 24 * 3600,
+    ) -> None:
+        """初始化。
+
+        :param path: 数据库文件路径，默认为 ``~/.cache/pytools/ocr.db``
+        :param max_bytes: 缓存结果的总大小上限（字节）
+        :param ttl: 结果的有效期（秒），None 表示永不过期
+        """
+
+        path = Path(path) if path is not None else self.DEFAULT_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(self.SCHEMA)
+        self._size = self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()[0]
+
+    @staticmethod
+    def key(data: ReadableBuffer, *parts: str) -> str:
+        """计算缓存键。
+
+        :param data: 图片内容
+        :param parts: 影响识别结果的其他参数，例如接口地址和参数名
+        :return: 十六进制摘要
+        """
+
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(part.encode())
+            h.update(b'\0')
+        h.update(data)
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存的结果，并更新访问时间。
+
+        :param key: 缓存键
+        :return: 识别结果，未命中或已过期时返回 None
+        """
+
+        with self._lock:
+            row = self._db.execute(
+                'SELECT text, created FROM results WHERE key = ?', (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or \
+                    (self.ttl is not None and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+            with self._db:
+                self._db.execute(
+                    'UPDATE results SET accessed = ? WHERE key = ?', (now, key)
+                )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, text: str) -> None:
+        """写入结果，必要时淘汰旧的结果。
+
+        :param key: 缓存键
+        :param text: 识别结果
+        """
+
+        size = len(text.encode()) + len(key)
+        now = time.time()
+        try:
+            with self._lock:
+                with self._db:
+                    old = self._db.execute(
+                        'SELECT size FROM results WHERE key = ?', (key,)
+                    ).fetchone()
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                        (key, text, size, now, now),
+                    )
+                self._size += size - (old[0] if old else 0)
+                if self._size > self.max_bytes:
+                    self.evict()
+        except sqlite3.Error as e:
+            logger.warning('failed to write OCR cache: %s', e)
+
+    def evict(self) -> None:
+        """删除过期的结果，再按最近访问时间删除结果直到总大小低于上限。"""
+
+        with self._lock, self._db:
+            if self.ttl is not None:
+                self._db.execute(
+                    'DELETE FROM results WHERE created < ?',
+                    (time.time() - self.ttl,),
+                )
+            self._size = self._db.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM results'
+            ).fetchone()[0]
+            if self._size <= self.max_bytes:
+                return
+            # 删到上限的 90%，避免每次写入都触发淘汰
+            target = self._size - int(self.max_bytes * 0.9)
+            freed = 0
+            keys = []
+            for key, size in self._db.execute(
+                'SELECT key, size FROM results ORDER BY accessed'
+            ):
+                if freed >= target:
+                    break
+                keys.append((key,))
+                freed += size
+            self._db.executemany('DELETE FROM results WHERE key = ?', keys)
+            self._size -= freed
+
+    def close(self) -> None:
+        """关闭数据库。"""
+
+        with self._lock:
+            self._db.close()
@@ -1,53 +1,224 @@
 import asyncio
 import json
+import os
+import random
+import time
 from base64 import b64encode
 from pathlib import Path
-from typing import Iterable, Optional
-from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    Union,
+)
 
 import aiofiles
-from aiohttp import ClientSession
 
-from ..logging import logger
-from ..types import AnyPath
+from ..logging import Progress, logger
+from ..metrics import Tracker, metrics
+from ..source import map_file
+from ..types import AnyPath, ReadableBuffer
+from .cache import ResultCache
+from .limiter import AdaptiveLimiter
+from .preprocess import PreprocessProfile, preprocess_image
+
+if TYPE_CHECKING:
+    from ..transform.profile import ImageProfile
+
+#: 执行一次识别的协程函数
+Job = Callable[[], Awaitable[str]]
+
+
+class OCRError(RuntimeError):
+    """识别服务返回的错误。"""
+
+    def __init__(self, code: int, msg: str) -> None:
+        super().__init__(msg)
+        #: 百度文字识别的错误码
+        self.code = code
 
 
 class Recognizer:
-    """文字识别类。"""
+    """文字识别类。
+
+    请求以滑动窗口的方式发送：任一请求完成后立即开始下一个，
+    进行中的请求数由 :class:`AdaptiveLimiter` 根据延迟和限流错误
+    在 :meth:`reset_concurrency` 设置的范围内自动调整。
+    """
 
     URL = 'https://aip.baidubce.com/rest/2.0/ocr/v1/general_basic'
+    TOKEN_URL = 'https://aip.baidubce.com/oauth/2.0/token'
+    #: QPS 超限（18）和服务整体请求量超限（4），稍后重试即可
+    THROTTLE_CODES = frozenset({4, 18})
+    #: 限流错误的最大重试次数
+    MAX_RETRIES = 5
+    #: 上传时每次编码的字节数，须为 3 的倍数
+    ENCODE_CHUNK = 3 * 2 ** 14
+    #: access token 的缓存文件，None 表示不缓存
+    TOKEN_PATH: Optional[Path] = Path.home() / '.config/baidu/token.json'
+    #: 在 token 到期前多久（秒）于后台刷新
+    TOKEN_REFRESH_MARGIN = 24 * 3600
+    #: 刷新 token 失败后的重试间隔（秒）
+    TOKEN_RETRY_INTERVAL = 60
+    #: DNS 解析结果的缓存时间和空闲连接的保持时间（秒）
+    DNS_CACHE_TTL = 300
+    KEEPALIVE_TIMEOUT = 60
 
     def __init__(
         self,
-        loop: Optional[asyncio.AbstractEventLoop] = None
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        *,
+        concurrency: int = 2,
+        cache: Optional[ResultCache] = None,
+        use_cache: bool = True,
+        preprocess: Optional[PreprocessProfile] = None,
+        workers: Optional[int] = None,
     ) -> None:
+        """初始化。
+
+        :param loop: 事件循环对象
+        :param concurrency: 并发量的最大值，连接池按此大小创建
+        :param cache: 识别结果缓存，默认使用 ``~/.cache/pytools/ocr.db``
+        :param use_cache: 是否使用识别结果缓存
+        :param preprocess: 上传前预处理图片的配置，None 表示原样上传
+        :param workers: 预处理图片的进程数，默认为 CPU 核数
+        """
+
         self._loop = loop or asyncio.get_event_loop()
-        self._sess = ClientSession(loop=self._loop)
+        self._own_cache = use_cache and cache is None
+        if use_cache:
+            self._cache: Optional[ResultCache] = cache or ResultCache()
+        else:
+            self._cache = None
+        self._pool_size = concurrency
+        self._sess = self._new_session()
+        self._closing: list[asyncio.Task] = []
+        self._refresher: Optional[asyncio.Task] = None
         self._keys = self._loop.create_task(self._load_api_keys())
-        self._token = self._loop.create_task(self._init_access_token())
-        self._concurrency = 2
+        self._token: asyncio.Future = \
+            self._loop.create_task(self._init_access_token())
+        self._limiter = AdaptiveLimiter(2)
+        self._preprocess = preprocess
+        self._workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.reset_concurrency(concurrency)
 
-    def reset_concurrency(self, concurrency: int) -> None:
-        """重新设置并发量。
+    def _new_session(self):
+        """创建连接池大小为 ``_pool_size`` 的会话。"""
+
+        from aiohttp import ClientSession, TCPConnector
+
+        connector = TCPConnector(
+            # 多留一个连接给后台刷新 token 的请求
+            limit=self._pool_size + 1,
+            ttl_dns_cache=self.DNS_CACHE_TTL,
+            keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+            loop=self._loop,
+        )
+        return ClientSession(connector=connector, loop=self._loop)
 
-        :param concurrency: 并发量大小
+    def reset_concurrency(self, concurrency: int, minimum: int = 1) -> None:
+        """重新设置并发量的范围，实际并发量从最大值开始自动调整。
+
+        :param concurrency: 并发量的最大值
+        :param minimum: 并发量的最小值
         """
 
-        self._concurrency = concurrency
+        self._limiter.set_bounds(concurrency, min(minimum, concurrency))
+        if concurrency > self._pool_size and not self._limiter.inflight:
+            # 连接池不能扩大，换用新的会话，旧的会话在获取 token 后关闭
+            self._pool_size = concurrency
+            old, self._sess = self._sess, self._new_session()
+            self._closing.append(
+                self._loop.create_task(self._close_session(old))
+            )
         if concurrency > 2:
             logger.info(f'concurrency has been setted to {concurrency}, '
                          'make sure that your account support it')
 
-    def _encode(self, data: bytes) -> str:
-        """对 URL 进行编码。
+    async def _close_session(self, sess) -> None:
+        await asyncio.wait({self._token})
+        await sess.close()
+
+    def _encode(self, data: ReadableBuffer) -> Iterator[bytes]:
+        """逐块进行 base64 编码和 URL 编码。
+
+        每次只编码 ``ENCODE_CHUNK`` 字节，内存中不会出现完整的编码结果。
+        块大小是 3 的倍数，各块的编码结果拼接起来与整体编码的结果相同。
 
         :param data: 需要编码的数据
-        :return: 编码完成的 URL
+        :return: 编码完成的数据块
         """
 
-        b64str = b64encode(data).decode()
-        url_encoded = quote(b64str)
-        return url_encoded
+        for start in range(0, len(data), self.ENCODE_CHUNK):
+            chunk = b64encode(data[start:start + self.ENCODE_CHUNK])
+            # base64 的字符中只有 + 和 = 需要转义，与 quote 的结果一致
+            yield chunk.replace(b'+', b'%2B').replace(b'=', b'%3D')
+
+    def _form_length(self, data: dict) -> int:
+        """计算 :meth:`_form_body` 生成的表单数据的总长度。
+
+        base64 编码后的长度为 4·⌈n/3⌉，转义时每个 ``+`` 和 ``=`` 多出
+        两个字节，因此只需逐块编码并计数，不保存编码结果。
+
+        :param data: 参数名到值的字典
+        :return: 字节数
+        """
+
+        length = 0
+        sep = 0
+        for key, value in data.items():
+            if not value:
+                continue
+            length += sep + len(key.encode()) + 1
+            sep = 1
+            if isinstance(value, str):
+                length += len(value.encode())
+                continue
+            length += 4 * -(-len(value) // 3)
+            for start in range(0, len(value), self.ENCODE_CHUNK):
+                chunk = b64encode(value[start:start + self.ENCODE_CHUNK])
+                length += 2 * (chunk.count(b'+') + chunk.count(b'='))
+        return length
+
+    async def _form_body(
+        self,
+        data: dict,
+        tracker: Tracker,
+    ) -> AsyncGenerator[bytes, None]:
+        """以流的形式生成表单数据。
+
+        :param data: 参数名到值的字典，字符串原样发送，其他数据逐块编码
+        :param tracker: 记录编码耗时和上传字节数的对象
+        :return: 表单数据块
+        """
+
+        sep = b''
+        for key, value in data.items():
+            if not value:
+                continue
+            yield sep + key.encode() + b'='
+            sep = b'&'
+            if isinstance(value, str):
+                tracker.input(len(value))
+                yield value.encode()
+                continue
+            chunks = self._encode(value)
+            while True:
+                with tracker.stage('encode'):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                tracker.input(len(chunk))
+                yield chunk
 
     async def _load_api_keys(self) -> tuple:
         """获取 API 的密钥。
@@ -74,28 +245,120 @@ class Recognizer:
         return config['API_KEY'], config['SECRET_KEY']
 
     async def _init_access_token(self) -> str:
-        """初始化 token 参数。"""
+        """初始化 token 参数。
+
+        优先使用缓存文件中未过期的 token，然后在后台定期刷新。
+        """
+
+        api_key, _ = await self._keys
+        record = await self._read_token(api_key)
+        if record is None:
+            record = await self._fetch_token()
+        self._refresher = self._loop.create_task(self._refresh_token(record))
+        return record['access_token']
+
+    async def _fetch_token(self) -> dict:
+        """向服务端申请新的 token，并写入缓存文件。
+
+        :return: 包含 token、申请时间和过期时间的记录
+        """
 
-        url = 'https://aip.baidubce.com/oauth/2.0/token'
         api_key, secret_key = await self._keys
         params = {
             "grant_type": "client_credentials",
             "client_id": api_key,
             "client_secret": secret_key,
         }
-        resp = await self._sess.post(url, params=params)
-        resp_dict = await resp.json(content_type=None)
+        now = time.time()
+        async with self._sess.post(self.TOKEN_URL, params=params) as resp:
+            resp_dict = await resp.json(content_type=None)
         token = resp_dict.get('access_token')
         if not token:
             msg = 'API_KEY and SECRET_KEY error'
             logger.error(msg)
             raise RuntimeError(msg)
-        return token
+        record = {
+            'api_key': api_key,
+            'access_token': token,
+            'created': now,
+            # 百度的 token 有效期为 30 天
+            'expires_at': now + float(resp_dict.get('expires_in', 2592000)),
+        }
+        await self._write_token(record)
+        return record
+
+    async def _read_token(self, api_key: str) -> Optional[dict]:
+        """读取缓存文件中属于 ``api_key`` 且未到刷新时间的 token。"""
+
+        if self.TOKEN_PATH is None or not self.TOKEN_PATH.exists():
+            return None
+        try:
+            async with aiofiles.open(self.TOKEN_PATH, 'r') as f:
+                record = json.loads(await f.read())
+            if record['api_key'] != api_key \
+                    or self._refresh_at(record) <= time.time():
+                return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning('ignored invalid token file %s: %s',
+                           self.TOKEN_PATH, e)
+            return None
+        logger.debug('reuse access token from %s', self.TOKEN_PATH)
+        return record
 
-    async def _send_data(self, data: dict) -> str:
+    async def _write_token(self, record: dict) -> None:
+        """原子地写入缓存文件，文件只有所有者可以读写。"""
+
+        if self.TOKEN_PATH is None:
+            return
+        tmp = self.TOKEN_PATH.with_suffix('.tmp')
+        try:
+            self.TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            async with aiofiles.open(fd, 'w') as f:
+                await f.write(json.dumps(record))
+            os.replace(tmp, self.TOKEN_PATH)
+        except OSError as e:
+            logger.warning('failed to save access token: %s', e)
+
+    def _refresh_at(self, record: dict) -> float:
+        """token 的刷新时间，有效期较短时在有效期过半时刷新。"""
+
+        lifetime = record['expires_at'] - record['created']
+        return record['expires_at'] \
+            - min(self.TOKEN_REFRESH_MARGIN, lifetime / 2)
+
+    async def _refresh_token(self, record: dict) -> None:
+        """在 token 过期前于后台刷新，刷新期间请求继续使用旧的 token。"""
+
+        from aiohttp import ClientError
+
+        refresh_at = self._refresh_at(record)
+        while True:
+            await asyncio.sleep(max(refresh_at - time.time(), 0))
+            try:
+                record = await self._fetch_token()
+            except (ClientError, asyncio.TimeoutError, RuntimeError) as e:
+                logger.warning('failed to refresh access token: %s', e)
+                refresh_at = time.time() + self.TOKEN_RETRY_INTERVAL
+                continue
+            token = self._loop.create_future()
+            token.set_result(record['access_token'])
+            self._token = token
+            refresh_at = self._refresh_at(record)
+            logger.debug('access token refreshed')
+
+    async def _send_data(
+        self,
+        data: dict,
+        tracker: Optional[Tracker] = None,
+    ) -> str:
         """对文件内容进行识别。
 
-        :param data: 需要发送的数据
+        图片数据在上传的同时逐块编码。发送前先在线程池中计算编码后的长度，
+        以 Content-Length 发送，识别服务不接受分块传输编码的请求体。
+
+        :param data: 需要发送的数据，图片数据为原始内容，URL 为字符串
+        :param tracker: 记录上传、响应耗时和错误的对象
         :return: 返回的结果
         """
         token = await self._token
@@ -103,18 +366,37 @@ class Recognizer:
             'Content-Type': 'application/x-www-form-urlencoded',
             'Accept': 'application/json'
         }
-        payload = '&'.join(f'{k}={v}' for k, v in data.items() if v)
-        resp = await self._sess.post(
-            self.URL,
-            headers=headers,
-            params={'access_token': token},
-            data=payload,
-        )
-        resp_dict = await resp.json(content_type=None)
+        tracker = tracker or Tracker(metrics, 'ocr', self.URL)
+        with tracker.stage('encode'):
+            length = await self._loop.run_in_executor(
+                None, self._form_length, data
+            )
+        headers['Content-Length'] = str(length)
+        start = time.perf_counter()
+        form = self._form_body(data, tracker)
+        try:
+            with tracker.stage('upload'):
+                resp = await self._sess.post(
+                    self.URL,
+                    headers=headers,
+                    params={'access_token': token},
+                    data=form,
+                )
+        finally:
+            await form.aclose()
+        with tracker.stage('response'):
+            body = await resp.read()
+        tracker.output(len(body))
+        resp_dict = json.loads(body)
         if 'error_code' in resp_dict:
-            msg = resp_dict['error_msg']
-            logger.error(msg)
-            raise RuntimeError(msg)
+            code, msg = int(resp_dict['error_code']), resp_dict['error_msg']
+            tracker.error(f'{code}: {msg}')
+            if code in self.THROTTLE_CODES:
+                self._limiter.throttled()
+            else:
+                logger.error(msg)
+            raise OCRError(code, msg)
+        self._limiter.observe(time.perf_counter() - start)
         return '\n'.join(
             result['words']
             for result in resp_dict['words_result']
@@ -131,32 +413,263 @@ class Recognizer:
         """
 
         async def parse(img: AnyPath):
-            data = {}
             if str(img).startswith('http'):
-                data['url'] = img
+                text = await self._request({'url': str(img)}, tracker)
             else:
-                async with aiofiles.open(img, 'rb') as f:
-                    content = await f.read()
-                if Path(img).suffix == '.pdf':
-                    data['pdf_file'] = self._encode(content)
-                else:
-                    data['image'] = self._encode(content)
-            return await self._send_data(data)
-        coros = {img: parse(img) for img in imgs}
-        concurrency = self._concurrency
-        result = {}
-        ids = tuple(coros.keys())
-        for i in range(0, len(coros), concurrency):
-            tasks = {
-                coro_id: self._loop.create_task(coros[coro_id])
-                for coro_id in ids[i: i + concurrency]
-            }
-            for _id, task in tasks.items():
-                result[_id] = await task
+                key = 'pdf_file' if Path(img).suffix == '.pdf' else 'image'
+                with map_file(img) as content:
+                    text = await self._recognize_data(content, key, tracker)
+            tracker.item()
+            progress.update()
+            return text
+        imgs = list(imgs)
+        progress = Progress('ocr', len(imgs), unit='images')
+        with metrics.track('ocr', f'{len(imgs)} images') as tracker:
+            result = await self._dispatch(
+                self._iterate((img, partial(parse, img)) for img in imgs),
+                tracker,
+            )
+        progress.close()
         logger.info('successfully recognized')
         return result
 
+    async def recognize_buffers(
+        self,
+        buffers: Union[
+            AsyncIterable[tuple[Hashable, ReadableBuffer]],
+            Iterable[tuple[Hashable, ReadableBuffer]],
+        ],
+        *, key: str = 'image',
+        name: str = 'buffers',
+    ) -> dict:
+        """识别内存中的图片。
+
+        同时进行的请求数不超过并发量，请求数达到上限时不再从 ``buffers``
+        取下一张图片，因此上游的生产速度会被限制在识别速度以内。
+
+        :param buffers: (标识, 图片数据) 的迭代器，可以是异步迭代器
+        :param key: 请求中图片数据的参数名，``image`` 或 ``pdf_file``
+        :param name: 记录指标时使用的名称
+        :return: 以标识为键、按输入顺序排列的结果
+        """
+
+        async def parse(data: ReadableBuffer) -> str:
+            text = await self._recognize_data(data, key, tracker)
+            tracker.item()
+            progress.update()
+            return text
+
+        async def jobs() -> AsyncGenerator[tuple[Hashable, Job], None]:
+            async for _id, data in source:
+                yield _id, partial(parse, data)
+        source = buffers if isinstance(buffers, AsyncIterable) \
+            else self._iterate(buffers)
+        progress = Progress(name, unit='images')
+        with metrics.track('ocr', name) as tracker:
+            result = await self._dispatch(jobs(), tracker)
+        progress.close()
+        return result
+
+    async def recognize_image(self, data: ReadableBuffer) -> str:
+        """识别内存中的一张图片，例如剪贴板中的截图。
+
+        :param data: 图片数据
+        :return: 识别结果
+        """
+
+        with metrics.track('ocr', 'image') as tracker:
+            await self._limiter.acquire()
+            try:
+                text = await self._recognize_data(data, 'image', tracker)
+            finally:
+                self._limiter.release()
+            tracker.item()
+        return text
+
+    async def _recognize_data(
+        self,
+        content: ReadableBuffer,
+        key: str,
+        tracker: Tracker,
+    ) -> str:
+        """识别图片数据，先查询结果缓存，命中时不访问网络。
+
+        设置了预处理配置时，图片在进程池中预处理后再上传，
+        缓存键包含预处理配置。
+
+        :param content: 图片或 PDF 的数据
+        :param key: 请求中数据的参数名，``image`` 或 ``pdf_file``
+        :param tracker: 记录指标的对象
+        :return: 识别结果
+        """
+
+        preprocess = self._preprocess if key == 'image' else None
+        cache_key = None
+        if self._cache is not None:
+            parts = [self.URL, key]
+            if preprocess is not None:
+                parts.append(preprocess.key)
+            with tracker.stage('cache'):
+                # 大文件的摘要和数据库读写都可能耗时，不在事件循环中进行
+                cache_key, text = await self._loop.run_in_executor(
+                    None, self._lookup_cache, content, parts,
+                )
+            if text is not None:
+                metrics.inc('cache_hits_total', type=tracker.kind)
+                return text
+            metrics.inc('cache_misses_total', type=tracker.kind)
+        if preprocess is not None:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self._workers)
+            with tracker.stage('preprocess'):
+                content = await self._loop.run_in_executor(
+                    self._pool, preprocess_image, bytes(content), preprocess,
+                )
+        text = await self._request({key: content}, tracker)
+        if cache_key is not None:
+            assert self._cache is not None
+            await self._loop.run_in_executor(
+                None, self._cache.put, cache_key, text,
+            )
+        return text
+
+    def _lookup_cache(
+        self,
+        content: ReadableBuffer,
+        parts: list[str],
+    ) -> tuple[str, Optional[str]]:
+        """在线程池中计算缓存键并查询缓存。
+
+        :param content: 图片或 PDF 的数据
+        :param parts: 缓存键中的其他参数
+        :return: (缓存键, 缓存的识别结果)
+        """
+
+        assert self._cache is not None
+        cache_key = self._cache.key(content, *parts)
+        return cache_key, self._cache.get(cache_key)
+
+    async def _request(self, data: dict, tracker: Tracker) -> str:
+        """发送请求，遇到限流错误时等待后重试。"""
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                return await self._send_data(data, tracker)
+            except OCRError as e:
+                if e.code not in self.THROTTLE_CODES:
+                    raise
+                if attempt == self.MAX_RETRIES:
+                    logger.error('%s (error code %d)', e, e.code)
+                    raise
+            # 退避时间以请求延迟为单位随重试次数指数增长，
+            # 并加入随机抖动以错开请求
+            base = self._limiter.latency or 0.1
+            await asyncio.sleep(
+                min(base * 2 ** attempt, 5) * (0.5 + random.random())
+            )
+        raise AssertionError('unreachable')
+
+    async def _dispatch(
+        self,
+        jobs: AsyncGenerator[tuple[Hashable, Job], None],
+        tracker: Tracker,
+    ) -> dict:
+        """以滑动窗口的方式执行识别任务。
+
+        任一请求完成后立即从 ``jobs`` 取下一个任务，进行中的请求数
+        不超过当前的并发上限；请求数达到上限时不会继续消费 ``jobs``，
+        因此上游的生产速度会被限制在识别速度以内。任一任务失败后
+        不再开始新的任务。结束时会关闭 ``jobs``。
+
+        :param jobs: (标识, 执行识别的协程函数) 的异步生成器
+        :param tracker: 记录队列深度的对象
+        :return: 以标识为键、按输入顺序排列的结果
+        """
+
+        async def run(job: Job) -> str:
+            try:
+                return await job()
+            except Exception:
+                failed.set()
+                raise
+            finally:
+                self._limiter.release()
+        failed = asyncio.Event()
+        tasks: dict[Hashable, asyncio.Task] = {}
+        try:
+            while True:
+                await self._limiter.acquire()
+                if failed.is_set():
+                    self._limiter.release()
+                    break
+                try:
+                    _id, job = await jobs.__anext__()
+                except StopAsyncIteration:
+                    self._limiter.release()
+                    break
+                tasks[_id] = self._loop.create_task(run(job))
+                tracker.queue_depth(self._limiter.inflight)
+            return {_id: await task for _id, task in tasks.items()}
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        finally:
+            await jobs.aclose()
+
+    @staticmethod
+    async def _iterate(items: Iterable) -> AsyncGenerator:
+        for item in items:
+            yield item
+
+    async def recognize_pdf(
+        self,
+        pdf_file: AnyPath,
+        *, dpi: int = 200,
+        workers: Optional[int] = None,
+        profile: Optional['ImageProfile'] = None,
+    ) -> dict:
+        """在本地逐页渲染 PDF 后识别，页面只存在于内存中，不写入磁盘。
+
+        渲染与网络请求同时进行，识别跟不上时渲染会暂停。
+
+        :param pdf_file: PDF 文件路径
+        :param dpi: 渲染的 dpi
+        :param workers: 渲染进程数，默认为 CPU 核心数
+        :param profile: 渲染的输出配置，默认为质量 90 的 JPEG 图片
+        :return: 以页码（从 1 开始）为键的结果
+        """
+
+        from ..transform.core import render_pages
+        from ..transform.profile import ImageProfile
+
+        pages = render_pages(
+            pdf_file,
+            loop=self._loop,
+            dpi=dpi,
+            workers=workers,
+            profile=profile or ImageProfile(format='jpeg', quality=90),
+            # 渲染的耗时记在 pdf2img 名下，与识别的各阶段分开
+            tracker=Tracker(metrics, 'pdf2img', str(pdf_file)),
+        )
+        try:
+            return await self.recognize_buffers(
+                ((index + 1, data) async for index, data in pages),
+                name=str(pdf_file),
+            )
+        finally:
+            await pages.aclose()
+
     async def exit(self):
         """关闭会话。"""
 
+        if self._refresher is not None:
+            self._refresher.cancel()
+        if not self._token.done():
+            self._token.cancel()
+        await asyncio.gather(*self._closing, return_exceptions=True)
         await self._sess.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._own_cache and self._cache is not None:
+            self._cache.close()
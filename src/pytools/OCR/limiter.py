@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+
+class AdaptiveLimiter:
+    """根据延迟和限流错误自动调整的并发上限（AIMD）。
+
+    每个请求成功且延迟正常时上限增加 ``1 / 上限``，即每轮请求增加 1；
+    延迟超过基准延迟的 ``tolerance`` 倍时上限乘以 0.9，服务端返回
+    QPS 限制错误时上限减半。每个往返时间内最多减小一次，上限始终在
+    ``[minimum, maximum]`` 之间。
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        minimum: int = 1,
+        *,
+        tolerance: float = 2.0,
+        smoothing: float = 0.2,
+    ) -> None:
+        """初始化，初始上限为 ``maximum``。
+
+        :param maximum: 并发上限的最大值
+        :param minimum: 并发上限的最小值
+        :param tolerance: 延迟超过基准延迟多少倍时认为服务端已经过载
+        :param smoothing: 延迟指数移动平均的系数
+        """
+
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._latency: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self.set_bounds(maximum, minimum)
+
+    def set_bounds(self, maximum: int, minimum: int = 1) -> None:
+        """设置并发上限的范围，当前上限重置为最大值。"""
+
+        if not 1 <= minimum <= maximum:
+            raise ValueError(f'invalid bounds: [{minimum}, {maximum}]')
+        self.maximum = maximum
+        self.minimum = minimum
+        self._limit = float(maximum)
+        self._wake()
+
+    @property
+    def limit(self) -> int:
+        """当前的并发上限。"""
+
+        return max(self.minimum, int(self._limit))
+
+    @property
+    def latency(self) -> Optional[float]:
+        """平滑后的请求延迟（秒）。"""
+
+        return self._latency
+
+    async def acquire(self) -> None:
+        """等待直到进行中的请求数小于上限。"""
+
+        while self.inflight >= self.limit:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                # 被唤醒后又被取消时，把机会让给下一个等待者
+                if fut.done() and not fut.cancelled():
+                    self._wake()
+                raise
+            finally:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+        self.inflight += 1
+
+    def release(self) -> None:
+        """一个请求结束。"""
+
+        self.inflight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self.limit - self.inflight
+        for fut in self._waiters:
+            if free <= 0:
+                break
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
+
+    def observe(self, latency: float) -> None:
+        """记录一个成功请求的延迟。
+
+        :param latency: 请求的耗时（秒）
+        """
+
+        if self._latency is None or self._baseline is None:
+            self._latency = self._baseline = latency
+        else:
+            self._latency += self.smoothing * (latency - self._latency)
+            # 基准取最小延迟，并缓慢上浮以适应网络状况的长期变化
+            self._baseline = min(
+                latency, self._baseline + 0.01 * (latency - self._baseline)
+            )
+        if self._latency > self.tolerance * self._baseline:
+            self._decrease(0.9)
+        else:
+            self._limit = min(float(self.maximum), self._limit + 1 / self._limit)
+            self._wake()
+
+    def throttled(self) -> None:
+        """服务端返回了 QPS 限制错误。"""
+
+        self._decrease(0.5)
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        # 同一轮中的请求反映的是同一次过载，只减小一次
+        if now - self._last_decrease < (self._latency or 0):
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.minimum), self._limit * factor)
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+from ..types import ReadableBuffer
+
+
+@dataclass(frozen=True)
+class PreprocessProfile:
+    """上传前的图片预处理配置。
+
+    默认配置按文字识别的需要缩小图片：转为灰度、裁掉纯色边框并重新压缩，
+    最长边不超过识别服务允许的 4096 像素。
+    """
+
+    #: 最长边的像素数上限，超过时等比缩小，None 表示不缩放
+    max_edge: Optional[int] = 4096
+    #: 是否转为灰度图
+    gray: bool = True
+    #: JPEG 压缩质量，None 表示只保存为 PNG
+    quality: Optional[int] = 85
+    #: 是否裁掉与左上角颜色相近的边框
+    autocrop: bool = True
+
+    #: 识别服务允许的最短边
+    MIN_EDGE = 15
+    #: 裁剪时与背景色的差异阈值和保留的边距（像素）
+    CROP_THRESHOLD = 16
+    CROP_MARGIN = 8
+
+    def __post_init__(self) -> None:
+        if self.max_edge is not None and self.max_edge < self.MIN_EDGE:
+            raise ValueError(
+                f'max_edge should be at least {self.MIN_EDGE}, got {self.max_edge}'
+            )
+        if self.quality is not None and not 0 < self.quality <= 100:
+            raise ValueError(f'quality should be in [1, 100], got {self.quality}')
+
+    @property
+    def key(self) -> str:
+        """区分不同配置的字符串，作为结果缓存键的一部分。"""
+
+        return (
+            f'max_edge={self.max_edge},gray={self.gray:d},'
+            f'quality={self.quality},autocrop={self.autocrop:d}'
+        )
+
+
+def preprocess_image(data: ReadableBuffer, profile: PreprocessProfile) -> bytes:
+    """在子进程中预处理一张图片。
+
+    处理后的图片分别编码为 PNG 和 JPEG，取较小的一个：截图一类颜色
+    较少的图片 PNG 更小，照片和扫描件 JPEG 更小。不需要缩放时，
+    如果结果并不比原始数据小，则返回原始数据。
+
+    :param data: 图片数据
+    :param profile: 预处理配置
+    :return: 处理后的图片数据
+    """
+
+    from PIL import Image, ImageChops
+
+    img = Image.open(BytesIO(data))
+    img.load()
+    resized = False
+    if 'A' in img.getbands() or 'transparency' in img.info:
+        # 透明区域按白色背景处理，否则会变成黑色
+        rgba = img.convert('RGBA')
+        img = Image.new('RGBA', img.size, 'white')
+        img.alpha_composite(rgba)
+    img = img.convert('L' if profile.gray else 'RGB')
+
+    if profile.autocrop:
+        background = Image.new(img.mode, img.size, img.getpixel((0, 0)))
+        diff = ImageChops.difference(img, background)
+        if img.mode != 'L':
+            diff = diff.convert('L')
+        bbox = diff.point(
+            lambda p: 255 if p > profile.CROP_THRESHOLD else 0
+        ).getbbox()
+        if bbox is not None:
+            m = profile.CROP_MARGIN
+            left, top = max(bbox[0] - m, 0), max(bbox[1] - m, 0)
+            right = min(bbox[2] + m, img.width)
+            bottom = min(bbox[3] + m, img.height)
+            if min(right - left, bottom - top) >= profile.MIN_EDGE \
+                    and (right - left, bottom - top) != img.size:
+                img = img.crop((left, top, right, bottom))
+
+    if profile.max_edge is not None and max(img.size) > profile.max_edge:
+        scale = profile.max_edge / max(img.size)
+        size = (
+            max(round(img.width * scale), 1),
+            max(round(img.height * scale), 1),
+        )
+        img = img.resize(size, Image.LANCZOS, reducing_gap=3.0)
+        resized = True
+
+    candidates = []
+    buf = BytesIO()
+    img.save(buf, 'PNG')
+    candidates.append(buf.getvalue())
+    if profile.quality is not None:
+        buf = BytesIO()
+        img.save(buf, 'JPEG', quality=profile.quality, optimize=True)
+        candidates.append(buf.getvalue())
+    if not resized:
+        candidates.append(bytes(data))
+    return min(candidates, key=len)
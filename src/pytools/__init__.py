@@ -1 +1,11 @@
-from .core import run
+import sys
+
+
+def run() -> None:
+    """ 程序入口，带参数时以命令行模式运行，否则启动图形界面。"""
+
+    if len(sys.argv) > 1:
+        from .cli import main
+        sys.exit(main())
+    from .core import run as run_gui
+    run_gui()
@@ -1,3 +1,4 @@
 import pytools
 
-pytools.run()
+if __name__ == '__main__':
+    pytools.run()
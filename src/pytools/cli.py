@@ -0,0 +1,308 @@
+"""命令行批处理模式，只依赖 asyncio，不会导入 PySide6。"""
+import argparse
+import asyncio
+import glob
+import json
+import sys
+from pathlib import Path
+from typing import Any, Coroutine, Optional, Sequence, TextIO
+
+from .logging import logger
+
+#: 导出指标文件的间隔（秒）
+METRICS_INTERVAL = 15
+
+
+def _expand(patterns: Sequence[str]) -> list[str]:
+    """展开通配符，Windows 的命令行不会替我们展开。"""
+
+    files: list[str] = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matched = sorted(glob.glob(pattern, recursive=True))
+            if not matched:
+                logger.warning(f'no file matches {pattern}')
+            files.extend(matched)
+        else:
+            files.append(pattern)
+    return files
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    from .transform.profile import PDF_PROFILES, ImageProfile
+
+    parser = argparse.ArgumentParser(
+        prog='pytools',
+        description='some useful tools, run without arguments to start the GUI',
+    )
+    parser.add_argument(
+        '--metrics', metavar='FILE',
+        help='write Prometheus metrics to FILE, refreshed periodically',
+    )
+    parser.add_argument(
+        '--events', metavar='FILE',
+        help="append structured events to FILE as JSON lines, '-' for stderr",
+    )
+    parser.add_argument(
+        '--log-format', choices=('text', 'json'),
+        help='log as plain text or as one JSON object per line',
+    )
+    parser.add_argument('--log-level', help='minimum level of printed logs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    transform = subparsers.add_parser('transform', help='transform files')
+    transform.add_argument(
+        'type',
+        choices=('pdf2img', 'pdf2docx', 'img2pdf', 'docx2pdf'),
+    )
+    transform.add_argument(
+        'inputs', nargs='+',
+        help='input files or glob patterns, image directories for img2pdf',
+    )
+    transform.add_argument('-o', '--output', default='.', help='output directory')
+    transform.add_argument(
+        '-j', '--jobs', type=int,
+        help='number of files transformed at the same time',
+    )
+    transform.add_argument(
+        '--workers', type=int,
+        help='number of worker processes used by a single file',
+    )
+    transform.add_argument(
+        '--store',
+        help='SQLite job queue, unfinished jobs in it are resumed first',
+    )
+    pdf2img = transform.add_argument_group('pdf2img')
+    pdf2img.add_argument('--dpi', type=int)
+    pdf2img.add_argument(
+        '--format', choices=tuple(ImageProfile.FORMATS), default='png'
+    )
+    pdf2img.add_argument('--quality', type=int, default=85)
+    pdf2img.add_argument('--gray', action='store_true')
+    pdf2img.add_argument('--pages', help="page ranges, e.g. '1-3,5'")
+    img2pdf = transform.add_argument_group('img2pdf')
+    img2pdf.add_argument('--profile', choices=tuple(PDF_PROFILES))
+
+    ocr = subparsers.add_parser('ocr', help='recognize text in images')
+    ocr.add_argument('inputs', nargs='+', help='image/PDF files, URLs or glob patterns')
+    ocr.add_argument(
+        '-j', '--jobs', type=int,
+        help='number of requests sent at the same time',
+    )
+    ocr.add_argument('--json', action='store_true', help='print results as JSON')
+    ocr.add_argument(
+        '--render', action='store_true',
+        help='render PDFs locally and recognize every page in memory',
+    )
+    ocr.add_argument('--dpi', type=int, default=200, help='dpi used by --render')
+    ocr.add_argument(
+        '--no-cache', dest='cache', action='store_false',
+        help='always send requests instead of reusing cached results',
+    )
+    ocr.add_argument(
+        '--preprocess', action='store_true',
+        help='crop, downscale and recompress images as grayscale JPEG before upload',
+    )
+
+    watch = subparsers.add_parser(
+        'watch', help='transform or recognize files dropped into directories'
+    )
+    watch.add_argument(
+        '-r', '--rule', nargs=3, action='append', required=True,
+        metavar=('ACTION', 'DIR', 'DEST'),
+        help='ACTION is one of pdf2img, pdf2docx, docx2pdf and ocr',
+    )
+    watch.add_argument(
+        '-j', '--jobs', type=int,
+        help='number of files transformed at the same time',
+    )
+    watch.add_argument('--index', help='processed-file index database')
+    watch.add_argument(
+        '--settle', type=float, default=2.0,
+        help='seconds a file must stay unchanged before it is processed',
+    )
+    watch.add_argument(
+        '--poll', action='store_true',
+        help='scan directories periodically instead of using inotify',
+    )
+    return parser
+
+
+async def _transform(args: argparse.Namespace) -> int:
+    from .transform import ImageProfile, Transformer, TransformType
+
+    type = TransformType[args.type.upper()]
+    options = {}
+    if args.workers is not None and type is not TransformType.DOCX2PDF:
+        options['workers'] = args.workers
+    if type is TransformType.PDF2IMG:
+        options['dpi'] = args.dpi
+        options['profile'] = ImageProfile(
+            format=args.format,
+            quality=args.quality,
+            gray=args.gray,
+            pages=args.pages,
+        )
+    elif type is TransformType.IMG2PDF:
+        options['profile'] = args.profile
+    transformer = Transformer(
+        loop=asyncio.get_running_loop(),
+        concurrency=args.jobs,
+        store=args.store,
+    )
+    try:
+        jobs = transformer.resume()
+        jobs += [
+            transformer.submit(file, args.output, type, **options)
+            for file in _expand(args.inputs)
+        ]
+        results = await asyncio.gather(
+            *(job.future for job in jobs),
+            return_exceptions=True,
+        )
+    finally:
+        await transformer.exit()
+    failed = sum(isinstance(result, BaseException) for result in results)
+    if failed:
+        logger.error(f'{failed} of {len(jobs)} jobs failed')
+    return int(bool(failed))
+
+
+async def _ocr(args: argparse.Namespace) -> int:
+    from .OCR import PreprocessProfile, Recognizer
+
+    recognizer = Recognizer(
+        loop=asyncio.get_running_loop(),
+        concurrency=args.jobs or 2,
+        use_cache=args.cache,
+        preprocess=PreprocessProfile() if args.preprocess else None,
+    )
+    try:
+        inputs = _expand(args.inputs)
+        pdfs = [
+            file for file in inputs
+            if args.render and file.lower().endswith('.pdf')
+            and not file.startswith('http')
+        ]
+        result = await recognizer.recognize(
+            [file for file in inputs if file not in pdfs]
+        )
+        for pdf in pdfs:
+            pages = await recognizer.recognize_pdf(pdf, dpi=args.dpi)
+            result.update(
+                (f'{pdf}#page={page}', text) for page, text in pages.items()
+            )
+    finally:
+        await recognizer.exit()
+    if args.json:
+        print(json.dumps(
+            {str(k): v for k, v in result.items()},
+            ensure_ascii=False,
+            indent=2,
+        ))
+    else:
+        for _id, text in result.items():
+            print(f'==> {_id} <==')
+            print(text)
+    return 0
+
+
+async def _watch(args: argparse.Namespace) -> int:
+    from .transform import Transformer, TransformType
+    from .watch import OCR, ProcessedIndex, Watcher, WatchRule
+
+    rules = []
+    for action, directory, dest in args.rule:
+        if action != OCR:
+            try:
+                action = TransformType[action.upper()]
+            except KeyError:
+                logger.error(f'unknown action: {action}')
+                return 2
+        rules.append(WatchRule(Path(directory), action, Path(dest)))
+    loop = asyncio.get_running_loop()
+    transformer = Transformer(loop=loop, concurrency=args.jobs)
+    recognizer = None
+    if any(rule.action == OCR for rule in rules):
+        from .OCR import Recognizer
+
+        recognizer = Recognizer(loop=loop)
+    try:
+        await Watcher(
+            rules,
+            transformer=transformer,
+            recognizer=recognizer,
+            index=ProcessedIndex(args.index),
+            settle=args.settle,
+            use_inotify=not args.poll,
+            loop=loop,
+        ).run()
+    finally:
+        await transformer.exit()
+        if recognizer is not None:
+            await recognizer.exit()
+    return 0
+
+
+async def _instrumented(
+    coro: Coroutine[Any, Any, int],
+    args: argparse.Namespace,
+) -> int:
+    """执行命令，同时按参数导出指标和事件。"""
+
+    from .metrics import metrics
+
+    def write_event(record: dict[str, Any]) -> None:
+        events.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        events.flush()
+
+    async def export() -> None:
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            metrics.write_textfile(args.metrics)
+    events: Optional[TextIO] = None
+    if args.events:
+        events = sys.stderr if args.events == '-' \
+            else open(args.events, 'a', encoding='utf-8')
+        metrics.subscribe(write_event)
+    exporter = asyncio.create_task(export()) if args.metrics else None
+    try:
+        return await coro
+    finally:
+        if exporter is not None:
+            exporter.cancel()
+            metrics.write_textfile(args.metrics)
+        if events is not None:
+            metrics.unsubscribe(write_event)
+            if events is not sys.stderr:
+                events.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """命令行入口。
+
+    :param argv: 命令行参数，默认为 ``sys.argv[1:]``
+    :return: 退出码
+    """
+
+    args = _build_parser().parse_args(argv)
+    if args.log_format is not None or args.log_level is not None:
+        from .logging import configure
+
+        configure(
+            json_output=None if args.log_format is None
+            else args.log_format == 'json',
+            level=args.log_level,
+        )
+    if args.command == 'transform':
+        return asyncio.run(_instrumented(_transform(args), args))
+    elif args.command == 'watch':
+        try:
+            return asyncio.run(_instrumented(_watch(args), args))
+        except KeyboardInterrupt:
+            return 0
+    return asyncio.run(_instrumented(_ocr(args), args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
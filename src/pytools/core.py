@@ -1,9 +1,9 @@
 import asyncio
+import os
 import sys
 from io import BytesIO
 from pathlib import Path
 
-import aiofiles
 import pyperclip
 from PIL import Image, ImageGrab
 from PySide6 import QtWidgets
@@ -15,7 +15,8 @@ from qasync import (
     asyncSlot,
 )
 
-from .OCR import Recognizer
+from .OCR import PreprocessProfile, Recognizer
+from .source import map_file
 from .transform import Transformer, TransformType
 from .ui.main_ui import Ui_MainWindow
 
@@ -29,7 +30,11 @@ class Pytools(Ui_MainWindow, QtWidgets.QMainWindow):
         # init transformer
         self._transformer = Transformer(loop=self._loop)
         # init recognizer
-        self._recognizer = Recognizer(loop=self._loop)
+        # 预处理会转为灰度并有损压缩，只在设置了 PYTOOLS_OCR_PREPROCESS=1 时启用
+        preprocess = None
+        if os.environ.get('PYTOOLS_OCR_PREPROCESS') == '1':
+            preprocess = PreprocessProfile()
+        self._recognizer = Recognizer(loop=self._loop, preprocess=preprocess)
 
         # init UI related
         super().__init__()
@@ -41,6 +46,7 @@ class Pytools(Ui_MainWindow, QtWidgets.QMainWindow):
 
     def deinit(self) -> None:
         asyncClose(self._recognizer.exit)()
+        asyncClose(self._transformer.exit)()
 
     def setupUi(self) -> None:
         super().setupUi(self)
@@ -82,13 +88,12 @@ class Pytools(Ui_MainWindow, QtWidgets.QMainWindow):
             return
         elif isinstance(clipboard_img, Image.Image):
             img_io = BytesIO()
-            clipboard_img.save(img_io, 'PNG')
-            img_data = img_io.getvalue()
+            # 上传前会重新压缩，这里只需要最快的无损编码
+            clipboard_img.save(img_io, 'PNG', compress_level=1)
+            result = await self._recognizer.recognize_image(img_io.getbuffer())
         else:
-            async with aiofiles.open(clipboard_img[0], 'rb') as f:
-                img_data = await f.read()
-        data = {'image': self._recognizer._encode(img_data)}
-        result = await self._recognizer._send_data(data)
+            with map_file(clipboard_img[0]) as img_data:
+                result = await self._recognizer.recognize_image(img_data)
         self.result_textbrowser.setText(result)
 
     @Slot()
@@ -1,14 +1,170 @@
+"""日志。
+
+日志记录只在调用方线程中放入队列，格式化和写出由后台线程完成，
+不会阻塞事件循环。fork 出的子进程中没有后台线程，日志改为直接写出。
+设置环境变量 ``PYTOOLS_LOG_FORMAT=json`` 或调用
+:func:`configure` 可以输出每行一个 JSON 对象的结构化日志。
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+TEXT_FORMAT = '[%(asctime)s] -> [%(filename)s: ' \
+    '%(funcName)s] -> [%(levelname)s]: %(message)s'
+
+# LogRecord 自带的属性，其余属性来自 extra 参数
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord(
+    '', 0, '', 0, '', None, None
+))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """把日志格式化为一行 JSON，``extra`` 中的字段原样输出。"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'file': record.filename,
+            'func': record.funcName,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """不在调用方线程中格式化的 QueueHandler。
+
+    标准库的实现会在放入队列前格式化消息，以便跨进程传递；
+    这里只在同一进程的线程之间传递，格式化可以全部留给后台线程。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _formatter(json_output: bool) -> logging.Formatter:
+    return JSONFormatter() if json_output else logging.Formatter(TEXT_FORMAT)
+
+
 def __init_logger():
-    import logging
     logger = logging.getLogger('pytools')
+    level = os.environ.get('PYTOOLS_LOG_LEVEL', 'INFO').upper()
     stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        '[%(asctime)s] -> [%(filename)s: '
-        '%(funcName)s] -> [%(levelname)s]: %(message)s')
+    stream_handler.setLevel(level)
+    stream_handler.setFormatter(
+        _formatter(os.environ.get('PYTOOLS_LOG_FORMAT') == 'json')
+    )
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(records, stream_handler, respect_handler_level=True)
+    listener.start()
+    # 退出前写完队列中剩余的日志
+    atexit.register(listener.stop)
+    queue_handler = _QueueHandler(records)
+    # 低于输出级别的日志不必进入队列
+    queue_handler.setLevel(level)
     logger.setLevel(logging.DEBUG)
-    stream_handler.setLevel(logging.INFO)
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
-    return logger
+    logger.addHandler(queue_handler)
+
+    def after_fork() -> None:
+        # 后台线程不会随 fork 复制到子进程，队列中的日志将无人写出。
+        # Python 3.12 起在有其他线程时 fork 会产生 DeprecationWarning，
+        # 这个线程一直存在，fork 方式的进程池都会触发该警告
+        atexit.unregister(listener.stop)
+        logger.removeHandler(queue_handler)
+        logger.addHandler(stream_handler)
+    os.register_at_fork(after_in_child=after_fork)
+    return logger, queue_handler, stream_handler
+
+
+logger, _queue_handler, _stream_handler = __init_logger()
+
+
+def configure(
+    *,
+    json_output: Optional[bool] = None,
+    level: Optional[str] = None,
+) -> None:
+    """修改日志的输出方式。
+
+    :param json_output: 是否输出 JSON 格式的日志
+    :param level: 输出的最低级别，例如 ``DEBUG``、``INFO``
+    """
+
+    if json_output is not None:
+        _stream_handler.setFormatter(_formatter(json_output))
+    if level is not None:
+        _queue_handler.setLevel(level.upper())
+        _stream_handler.setLevel(level.upper())
+
+
+class Progress:
+    """限制频率的进度日志。
+
+    每项完成时调用 :meth:`update`，每隔 ``interval`` 秒最多输出一条
+    汇总进度，结束时调用 :meth:`close` 输出总数和耗时。
+    """
+
+    def __init__(
+        self,
+        task: str,
+        total: Optional[int] = None,
+        *,
+        unit: str = 'pages',
+        interval: float = 1.0,
+    ) -> None:
+        """初始化。
+
+        :param task: 任务的描述，例如文件名
+        :param total: 总项数，未知时为 None
+        :param unit: 项的单位，出现在日志中
+        :param interval: 两条进度日志之间的最短间隔（秒）
+        """
+
+        self.task = task
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.done = 0
+        self._start = self._last = time.monotonic()
+
+    def update(self, n: int = 1) -> None:
+        """记录完成了 ``n`` 项。"""
+
+        self.done += n
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        if self.total is None:
+            logger.info(
+                '%s: %d %s done', self.task, self.done, self.unit,
+                stacklevel=2,
+            )
+        else:
+            logger.info(
+                '%s: %d/%d %s done',
+                self.task, self.done, self.total, self.unit,
+                stacklevel=2,
+            )
+
+    def close(self) -> None:
+        """输出汇总。"""
 
-logger = __init_logger()
+        elapsed = time.monotonic() - self._start
+        logger.info(
+            '%s: %d %s done in %.2fs',
+            self.task, self.done, self.unit, elapsed,
+            stacklevel=2,
+        )
@@ -0,0 +1,284 @@
+"""转换和文字识别的运行指标。
+
+每次转换或识别由一个 :class:`Tracker` 记录各阶段耗时、处理的页数、
+输入输出字节数、队列深度和错误，汇总到全局的 :data:`metrics` 中。
+结束时产生一条结构化事件，汇总结果可以导出为 Prometheus 的文本格式。
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .logging import logger
+from .types import AnyPath
+
+Labels = tuple[tuple[str, str], ...]
+Listener = Callable[[dict[str, Any]], None]
+
+
+def _labels(**labels: Any) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Tracker:
+    """记录一次转换或识别的指标。"""
+
+    def __init__(self, metrics: 'Metrics', kind: str, subject: str) -> None:
+        self._metrics = metrics
+        self.kind = kind
+        self.subject = subject
+        self.items = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        #: 各阶段累计耗时（秒）
+        self.stages: dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        """已经经过的时间（秒）。"""
+
+        return time.perf_counter() - self._start
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """记录一个阶段的耗时。
+
+        :param stage: 阶段名称，例如 ``render``、``write``、``upload``
+        :param seconds: 耗时
+        """
+
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self._metrics.observe(
+            'stage_seconds', seconds, type=self.kind, stage=stage
+        )
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """记录 ``with`` 块所在阶段的耗时。"""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def item(self, bytes_out: int = 0) -> None:
+        """记录完成了一页或一张图片。
+
+        :param bytes_out: 该项输出的字节数
+        """
+
+        self.items += 1
+        self._metrics.inc('items_total', type=self.kind)
+        if bytes_out:
+            self.output(bytes_out)
+
+    def input(self, size: int) -> None:
+        """记录读入的字节数。"""
+
+        self.bytes_in += size
+        self._metrics.inc('bytes_in_total', size, type=self.kind)
+
+    def output(self, size: int) -> None:
+        """记录输出的字节数。"""
+
+        self.bytes_out += size
+        self._metrics.inc('bytes_out_total', size, type=self.kind)
+
+    def queue_depth(self, depth: int) -> None:
+        """记录当前等待处理的项数。"""
+
+        self._metrics.set('queue_depth', depth, type=self.kind)
+
+    def error(self, reason: str = '') -> None:
+        """记录一个不会中断整个任务的错误。"""
+
+        self._metrics.inc('errors_total', type=self.kind)
+        self._metrics.emit(
+            'error', type=self.kind, subject=self.subject, reason=reason
+        )
+
+
+class Metrics:
+    """指标注册表，只应在事件循环所在的线程中更新。"""
+
+    PREFIX = 'pytools_'
+    HELP = {
+        'stage_seconds': 'Time spent in each stage',
+        'items_total': 'Pages or images processed',
+        'bytes_in_total': 'Bytes read from inputs',
+        'bytes_out_total': 'Bytes written or received',
+        'errors_total': 'Failed transforms and requests',
+        'queue_depth': 'Items waiting in the pipeline',
+        'runs_total': 'Finished transforms and recognitions',
+        'run_seconds': 'Duration of transforms and recognitions',
+        'items_per_second': 'Throughput of the last finished run',
+        'cache_hits_total': 'Results served from the OCR cache',
+        'cache_misses_total': 'Lookups that missed the OCR cache',
+    }
+
+    def __init__(self) -> None:
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._gauges: dict[tuple[str, Labels], float] = {}
+        # 名称和标签 -> [次数, 总和]
+        self._summaries: dict[tuple[str, Labels], list[float]] = {}
+        self._listeners: list[Listener] = []
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """增加计数器。"""
+
+        key = (name, _labels(**labels))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """设置瞬时值。"""
+
+        self._gauges[(name, _labels(**labels))] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """记录一次观测值，导出时给出次数和总和。"""
+
+        summary = self._summaries.setdefault((name, _labels(**labels)), [0, 0.0])
+        summary[0] += 1
+        summary[1] += value
+
+    def subscribe(self, listener: Listener) -> None:
+        """订阅结构化事件。
+
+        :param listener: 接收事件字典的函数，在事件循环中同步调用
+        """
+
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        """取消订阅。"""
+
+        self._listeners.remove(listener)
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """产生一条结构化事件。"""
+
+        record = {'event': event, 'time': time.time(), **fields}
+        for listener in tuple(self._listeners):
+            try:
+                listener(record)
+            except Exception as e:
+                logger.warning(f'metrics listener failed: {e!r}')
+
+    @contextmanager
+    def track(self, kind: str, subject: Any) -> Iterator[Tracker]:
+        """记录一次转换或识别，结束时产生 ``done`` 或 ``failed`` 事件。
+
+        :param kind: 类型，例如 ``pdf2img``、``ocr``
+        :param subject: 处理的对象，通常为文件路径
+        :return: 记录指标的对象
+        """
+
+        tracker = Tracker(self, kind, str(subject))
+        try:
+            yield tracker
+        except BaseException as e:
+            self.inc('errors_total', type=kind)
+            self._finish(tracker, 'failed', error=repr(e))
+            raise
+        else:
+            self._finish(tracker, 'done')
+        finally:
+            self.set('queue_depth', 0, type=kind)
+
+    def _finish(self, tracker: Tracker, event: str, **fields: Any) -> None:
+        elapsed = tracker.elapsed
+        rate = tracker.items / elapsed if elapsed > 0 else 0.0
+        self.inc('runs_total', type=tracker.kind, result=event)
+        self.observe('run_seconds', elapsed, type=tracker.kind)
+        if event == 'done':
+            self.set('items_per_second', rate, type=tracker.kind)
+        self.emit(
+            event,
+            type=tracker.kind,
+            subject=tracker.subject,
+            seconds=round(elapsed, 6),
+            items=tracker.items,
+            items_per_second=round(rate, 3),
+            bytes_in=tracker.bytes_in,
+            bytes_out=tracker.bytes_out,
+            stages={k: round(v, 6) for k, v in tracker.stages.items()},
+            **fields,
+        )
+
+    def value(self, name: str, **labels: Any) -> float:
+        """获取计数器或瞬时值，汇总指标返回总和。"""
+
+        key = (name, _labels(**labels))
+        if key in self._counters:
+            return self._counters[key]
+        if key in self._summaries:
+            return self._summaries[key][1]
+        return self._gauges.get(key, 0)
+
+    def reset(self) -> None:
+        """清空所有指标。"""
+
+        self._counters.clear()
+        self._gauges.clear()
+        self._summaries.clear()
+
+    @staticmethod
+    def _format(name: str, labels: Labels, value: float) -> str:
+        if labels:
+            pairs = ','.join(
+                '{}="{}"'.format(
+                    k, v.replace('\\', r'\\').replace('"', r'\"')
+                    .replace('\n', r'\n'),
+                )
+                for k, v in labels
+            )
+            name = f'{name}{{{pairs}}}'
+        return f'{name} {value!r}'
+
+    def render(self) -> str:
+        """导出为 Prometheus 的文本格式。"""
+
+        groups: dict[str, tuple[str, list[str]]] = {}
+
+        def add(name: str, type: str, line: str) -> None:
+            groups.setdefault(name, (type, []))[1].append(line)
+        for (name, labels), value in sorted(self._counters.items()):
+            add(name, 'counter', self._format(self.PREFIX + name, labels, value))
+        for (name, labels), value in sorted(self._gauges.items()):
+            add(name, 'gauge', self._format(self.PREFIX + name, labels, value))
+        for (name, labels), (count, total) in sorted(self._summaries.items()):
+            metric = self.PREFIX + name
+            add(name, 'summary', self._format(f'{metric}_count', labels, count))
+            add(name, 'summary', self._format(f'{metric}_sum', labels, total))
+        lines = []
+        for name, (type, samples) in groups.items():
+            metric = self.PREFIX + name
+            lines.append(f'# HELP {metric} {self.HELP.get(name, name)}')
+            lines.append(f'# TYPE {metric} {type}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: AnyPath) -> None:
+        """原子地写入 Prometheus 文本文件，供 node_exporter 的 textfile 收集器读取。
+
+        :param path: 文件路径
+        """
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+#: 全局的指标注册表
+metrics = Metrics()
+
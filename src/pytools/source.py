@@ -0,0 +1,60 @@
+import hashlib
+import mmap
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional, Union
+
+from .types import AnyPath
+
+if TYPE_CHECKING:
+    import fitz
+
+
+@contextmanager
+def map_file(file: AnyPath) -> Iterator[Union[mmap.mmap, bytes]]:
+    """以只读内存映射的方式打开文件，内容按需从磁盘读入。
+
+    :param file: 文件路径
+    :return: 支持缓冲区协议的只读映射对象，空文件返回 ``b''``
+    """
+
+    with open(file, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            yield b''
+            return
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def open_pdf(
+    pdf_file: AnyPath,
+    password: Optional[str] = None,
+) -> 'fitz.Document':
+    """通过路径打开 PDF 文档，页面在访问时才会被解析。
+
+    :param pdf_file: PDF 文件路径
+    :param password: 文档密码
+    :return: 文档对象
+    """
+
+    import fitz
+
+    pdf = fitz.Document(str(pdf_file))
+    if password and pdf.needs_pass:
+        pdf.authenticate(password)
+    return pdf
+
+
+def digest_file(file: AnyPath) -> str:
+    """计算文件内容的 SHA-256 摘要。
+
+    :param file: 文件路径
+    :return: 十六进制摘要
+    """
+
+    with map_file(file) as content:
+        return hashlib.sha256(content).hexdigest()
@@ -1,9 +1,30 @@
 import asyncio
+import os
 from enum import IntEnum
-from typing import Iterable, Optional
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
 
+from ..logging import logger
 from ..types import AnyPath
-from .core import docx2pdf, img2pdf, pdf2docx, pdf2img
+from .backend import (
+    ConverterBackend,
+    ConverterPool,
+    FakeBackend,
+    LibreOfficeBackend,
+    WordBackend,
+    default_backend,
+)
+from .core import (
+    IMAGE_SUFFIXES,
+    docx2pdf,
+    img2pdf,
+    pdf2docx,
+    pdf2img,
+    render_pages,
+)
+from .profile import PDF_PROFILES, ImageProfile, PDFProfile
+from .scheduler import Job, JobState, Scheduler
+from .store import JobRecord, JobStore
 
 
 class TransformType(IntEnum):
@@ -18,40 +39,188 @@ class TransformType(IntEnum):
 class Transformer:
     """控制文件转换类。"""
 
+    #: pdf2img、pdf2docx 和 img2pdf 本身会占满所有核心，
+    #: 同时运行两个任务以便 I/O 与计算重叠
+    DEFAULT_TYPE_LIMITS = {
+        TransformType.PDF2IMG: 2,
+        TransformType.PDF2DOCX: 2,
+        TransformType.IMG2PDF: 2,
+    }
+
     def __init__(
         self,
         *,
-        loop: Optional[asyncio.AbstractEventLoop] = None
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        docx_backend: Callable[[], ConverterBackend] = default_backend,
+        docx_workers: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        type_limits: Optional[dict[TransformType, int]] = None,
+        store: Optional[AnyPath] = None,
+        max_attempts: int = 3,
     ) -> None:
         """初始化。
 
         :param loop: 事件循环对象
+        :param docx_backend: 创建 docx2pdf 转换后端的函数
+        :param docx_workers: docx2pdf 转换后端的数量
+        :param concurrency: 同时进行的转换任务数，默认为 CPU 核心数
+        :param type_limits: 每种转换类型同时进行的任务数，默认见 ``DEFAULT_TYPE_LIMITS``
+        :param store: SQLite 任务队列的路径，设置后任务状态会被持久化，
+            可以通过 ``resume`` 恢复上次未完成的任务
+        :param max_attempts: 恢复任务时的最大尝试次数，失败和崩溃时
+            正在运行的任务在达到该次数前会被重试
         """
 
         self._loop = loop if loop is not None else asyncio.get_event_loop()
+        # 转换程序在第一次 docx2pdf 时启动，之后一直复用
+        self._docx_pool = ConverterPool(
+            docx_backend,
+            docx_workers,
+            loop=self._loop,
+        )
+        limits = dict(self.DEFAULT_TYPE_LIMITS)
+        limits[TransformType.DOCX2PDF] = self._docx_pool.size
+        limits.update(type_limits or {})
+        self._scheduler = Scheduler(
+            self._run,
+            concurrency=concurrency or os.cpu_count() or 1,
+            type_limits=limits,
+            on_finish=self._record,
+            loop=self._loop,
+        )
+        self._store = JobStore(store) if store is not None else None
+        self._max_attempts = max_attempts
+        self._closing = False
+        # img2pdf 的输出文件名固定，同一目录的任务需要依次执行
+        self._img2pdf_locks: dict[Path, asyncio.Lock] = {}
+
+    def submit(
+        self,
+        file: AnyPath,
+        dest_path: AnyPath,
+        type: TransformType,
+        *,
+        priority: int = 0,
+        **options: Any,
+    ) -> Job:
+        """提交一个转换任务。
+
+        :param file: 需要转换的文件，img2pdf 时为图片目录
+        :param dest_path: 转换后的文件的保存位置
+        :param type: 转换类型
+        :param priority: 优先级，数值越大越先执行
+        :param options: 传递给对应转换函数的参数，例如 pdf2img 的 ``profile``
+        :return: 任务对象，通过 ``job.future`` 等待结果，``job.cancel()`` 取消
+        """
+
+        record_id = None
+        if self._store is not None:
+            record_id = self._store.add(
+                str(file), str(dest_path), type, options, priority
+            )
+        return self._submit(file, dest_path, type, priority, options, record_id)
+
+    def _submit(
+        self,
+        file: AnyPath,
+        dest_path: AnyPath,
+        type: TransformType,
+        priority: int,
+        options: dict[str, Any],
+        record_id: Optional[int],
+    ) -> Job:
+        job = self._scheduler.submit(
+            file, dest_path, type, priority=priority, **options
+        )
+        job.record_id = record_id
+        return job
+
+    def _record(self, job: Job) -> None:
+        """把结束的任务状态写入任务队列。"""
+
+        if self._store is None or job.record_id is None:
+            return
+        if self._closing and job.state is JobState.CANCELLED:
+            # 退出时被取消的任务下次启动时恢复，不计入尝试次数
+            self._store.requeue(job.record_id)
+            return
+        error = ''
+        if job.state is JobState.FAILED and not job.future.cancelled():
+            error = repr(job.future.exception())
+        self._store.mark(job.record_id, job.state, error)
+
+    def resume(self) -> list[Job]:
+        """恢复任务队列中上次未完成的任务。
+
+        :return: 重新提交的任务
+        """
+
+        if self._store is None:
+            return []
+        records = self._store.unfinished(self._max_attempts)
+        if records:
+            logger.info(f'resume {len(records)} unfinished transform jobs')
+        return [
+            self._submit(
+                record.file, record.dest_path, TransformType(record.type),
+                record.priority, record.options, record.id,
+            )
+            for record in records
+        ]
+
+    async def _run(self, job: Job) -> None:
+        """执行一个转换任务。"""
+
+        if self._store is not None and job.record_id is not None:
+            self._store.mark(job.record_id, JobState.RUNNING)
+        if job.type is TransformType.PDF2IMG:
+            await pdf2img(job.file, job.dest_path, loop=self._loop, **job.options)
+        elif job.type is TransformType.PDF2DOCX:
+            await pdf2docx(job.file, job.dest_path, loop=self._loop, **job.options)
+        elif job.type is TransformType.IMG2PDF:
+            lock = self._img2pdf_locks.setdefault(
+                Path(job.dest_path).resolve(), asyncio.Lock()
+            )
+            async with lock:
+                await img2pdf(
+                    job.file, job.dest_path, loop=self._loop, **job.options
+                )
+        elif job.type is TransformType.DOCX2PDF:
+            await docx2pdf(
+                job.file, job.dest_path,
+                loop=self._loop, pool=self._docx_pool, **job.options
+            )
 
     async def __call__(
         self,
         files: Iterable[AnyPath],
         dest_path: AnyPath,
         type: TransformType,
+        *,
+        priority: int = 0,
+        **options: Any,
     )-> None:
-        """ 转换。
+        """ 并发转换多个文件，全部完成后返回。
 
         :param files: 需要转换的文件
         :param dest_path: 转换后的文件的保存位置
         :param type: 转换类型
+        :param priority: 优先级，数值越大越先执行
+        :param options: 传递给对应转换函数的参数，例如 pdf2img 的 ``profile``
         """
 
-        if type is TransformType.PDF2IMG:
-            for file in files:
-                await pdf2img(file, dest_path, loop=self._loop)
-        elif type is TransformType.PDF2DOCX:
-            for file in files:
-                await pdf2docx(file, dest_path, loop=self._loop)
-        elif type is TransformType.IMG2PDF:
-            for imgs_dir in files:
-                await img2pdf(imgs_dir, dest_path, loop=self._loop)
-        elif type is TransformType.DOCX2PDF:
-            for file in files:
-                await docx2pdf(file, dest_path, loop=self._loop)
+        jobs = [
+            self.submit(file, dest_path, type, priority=priority, **options)
+            for file in files
+        ]
+        await asyncio.gather(*(job.future for job in jobs))
+
+    async def exit(self) -> None:
+        """取消未完成的任务并关闭转换后端。"""
+
+        self._closing = True
+        await self._scheduler.shutdown()
+        await self._docx_pool.close()
+        if self._store is not None:
+            self._store.close()
+            self._store = None
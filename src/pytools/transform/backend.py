@@ -0,0 +1,434 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from ..logging import logger
+
+
+class ConverterBackend(ABC):
+    """docx2pdf 的转换后端。
+
+    一个后端实例对应一个长期运行的转换程序，``start``、``convert`` 和
+    ``stop`` 总是在同一个专用线程中调用。
+    """
+
+    def start(self) -> None:
+        """启动转换程序。"""
+
+    @abstractmethod
+    def convert(self, docx_file: Path, pdf_file: Path) -> None:
+        """把 Word 文件转换为 PDF 文件。
+
+        :param docx_file: Word 文件的绝对路径
+        :param pdf_file: PDF 文件的绝对路径
+        """
+
+    def stop(self) -> None:
+        """关闭转换程序。"""
+
+    def is_alive(self) -> bool:
+        """转换程序是否仍在运行，转换失败后用于判断是否需要重启。
+
+        :return: 转换程序已经退出或断开连接时为 False
+        """
+
+        return True
+
+
+class WordBackend(ConverterBackend):
+    """通过 COM 调用 Microsoft Word，仅支持 Windows。"""
+
+    def __init__(self) -> None:
+        self._word = None
+
+    def start(self) -> None:
+        import pythoncom
+        from win32com import client
+
+        pythoncom.CoInitialize()
+        self._word = client.DispatchEx('Word.Application')
+        self._word.Visible = False
+        self._word.DisplayAlerts = 0
+
+    def convert(self, docx_file: Path, pdf_file: Path) -> None:
+        assert self._word is not None
+        doc = self._word.Documents.Open(
+            str(docx_file),
+            ReadOnly=True,
+            AddToRecentFiles=False,
+        )
+        try:
+            doc.SaveAs(str(pdf_file), FileFormat=17)
+        finally:
+            doc.Close(0)
+
+    def is_alive(self) -> bool:
+        if self._word is None:
+            return False
+        try:
+            # Word 退出后访问任何属性都会抛出 com_error
+            self._word.Version
+        except Exception:
+            return False
+        return True
+
+    def stop(self) -> None:
+        import pythoncom
+
+        if self._word is not None:
+            try:
+                self._word.Quit()
+            finally:
+                self._word = None
+                pythoncom.CoUninitialize()
+
+
+class LibreOfficeBackend(ConverterBackend):
+    """无界面运行的 LibreOffice。
+
+    每个实例使用独立的用户配置目录，启动一个常驻的 soffice 进程，
+    通过 UNO 管道连接后重复使用。没有安装 python UNO 绑定时，退化为
+    每个文件调用一次 ``soffice --convert-to``，但仍复用已初始化的配置目录。
+    """
+
+    STARTUP_TIMEOUT = 60
+
+    def __init__(self, soffice: Optional[str] = None) -> None:
+        """初始化。
+
+        :param soffice: soffice 可执行文件，默认在 PATH 中查找
+        """
+
+        self._soffice = soffice or shutil.which('soffice') \
+            or shutil.which('libreoffice')
+        if self._soffice is None:
+            raise RuntimeError('can not find soffice, please install LibreOffice')
+        self._profile_dir: Optional[str] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._desktop = None
+
+    def _base_args(self) -> list[str]:
+        assert self._soffice is not None and self._profile_dir is not None
+        return [
+            self._soffice,
+            f'-env:UserInstallation={Path(self._profile_dir).as_uri()}',
+            '--headless', '--invisible', '--nologo',
+            '--norestore', '--nodefault', '--nolockcheck',
+        ]
+
+    def start(self) -> None:
+        self._profile_dir = tempfile.mkdtemp(prefix='pytools-lo-')
+        try:
+            import uno
+        except ImportError:
+            logger.warning('python UNO bindings not found, '
+                           'LibreOffice will be started for every file')
+            return
+        pipe = f'pytools-{uuid.uuid4().hex}'
+        self._proc = subprocess.Popen(
+            self._base_args() + [f'--accept=pipe,name={pipe};urp;'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            'com.sun.star.bridge.UnoUrlResolver', local
+        )
+        deadline = time.monotonic() + self.STARTUP_TIMEOUT
+        while True:
+            try:
+                ctx = resolver.resolve(
+                    f'uno:pipe,name={pipe};urp;StarOffice.ComponentContext'
+                )
+                break
+            except Exception:
+                if self._proc.poll() is not None or \
+                    time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError('failed to start LibreOffice')
+                time.sleep(0.2)
+        self._desktop = ctx.ServiceManager.createInstanceWithContext(
+            'com.sun.star.frame.Desktop', ctx
+        )
+
+    @staticmethod
+    def _props(**kwargs) -> tuple:
+        import uno
+
+        props = []
+        for name, value in kwargs.items():
+            prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
+            prop.Name = name
+            prop.Value = value
+            props.append(prop)
+        return tuple(props)
+
+    def convert(self, docx_file: Path, pdf_file: Path) -> None:
+        if self._desktop is None:
+            self._convert_once(docx_file, pdf_file)
+            return
+        doc = self._desktop.loadComponentFromURL(
+            docx_file.as_uri(), '_blank', 0, self._props(Hidden=True)
+        )
+        if doc is None:
+            raise RuntimeError(f'LibreOffice failed to open {docx_file}')
+        try:
+            doc.storeToURL(
+                pdf_file.as_uri(),
+                self._props(FilterName='writer_pdf_Export'),
+            )
+        finally:
+            doc.close(True)
+
+    def _convert_once(self, docx_file: Path, pdf_file: Path) -> None:
+        with tempfile.TemporaryDirectory(prefix='pytools-lo-out-') as out_dir:
+            subprocess.run(
+                self._base_args() + [
+                    '--convert-to', 'pdf', '--outdir', out_dir, str(docx_file)
+                ],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            shutil.move(
+                str(Path(out_dir) / (docx_file.stem + '.pdf')),
+                str(pdf_file),
+            )
+
+    def is_alive(self) -> bool:
+        if self._proc is not None and self._proc.poll() is not None:
+            return False
+        if self._desktop is not None:
+            try:
+                self._desktop.getFrames()
+            except Exception:
+                # soffice 崩溃后 UNO 桥会抛出 DisposedException
+                return False
+        return True
+
+    def stop(self) -> None:
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                # 进程退出时连接会断开
+                pass
+            self._desktop = None
+        if self._proc is not None:
+            try:
+                self._proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+            self._proc = None
+        if self._profile_dir is not None:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+
+class FakeBackend(ConverterBackend):
+    """不依赖任何外部程序的后端，写出只有一个空白页的 PDF，用于测试。"""
+
+    PDF = (
+        b'%PDF-1.4\n'
+        b'1 0 obj\n<</Type /Catalog /Pages 2 0 R>>\nendobj\n'
+        b'2 0 obj\n<</Type /Pages /Kids [3 0 R] /Count 1>>\nendobj\n'
+        b'3 0 obj\n<</Type /Page /Parent 2 0 R /MediaBox [0 0 595 842]>>\n'
+        b'endobj\n'
+        b'trailer\n<</Root 1 0 R>>\n%%EOF\n'
+    )
+
+    def __init__(self, delay: float = 0.0) -> None:
+        """初始化。
+
+        :param delay: 每次转换的耗时（秒），用于模拟真实后端
+        """
+
+        self.delay = delay
+        self.started = 0
+        self.converted = 0
+        #: 置为 False 模拟转换程序崩溃
+        self.alive = False
+
+    def start(self) -> None:
+        self.started += 1
+        self.alive = True
+
+    def convert(self, docx_file: Path, pdf_file: Path) -> None:
+        if not docx_file.is_file():
+            raise FileNotFoundError(docx_file)
+        if not self.alive:
+            raise RuntimeError('backend is not running')
+        if self.delay:
+            time.sleep(self.delay)
+        pdf_file.write_bytes(self.PDF)
+        self.converted += 1
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def stop(self) -> None:
+        self.alive = False
+
+
+def default_backend() -> ConverterBackend:
+    """根据平台选择默认的转换后端。"""
+
+    if sys.platform == 'win32':
+        return WordBackend()
+    return LibreOfficeBackend()
+
+
+class _Worker:
+    """独占一个线程的后端实例。"""
+
+    def __init__(self, backend: ConverterBackend) -> None:
+        self.backend = backend
+        self.executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix='pytools-docx2pdf',
+        )
+
+
+class ConverterPool:
+    """长期运行的转换后端池，在多个文件之间复用已启动的转换程序。"""
+
+    def __init__(
+        self,
+        backend_factory: Callable[[], ConverterBackend] = default_backend,
+        size: Optional[int] = None,
+        *,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        """初始化，后端在第一次转换时才启动。
+
+        :param backend_factory: 创建后端实例的函数
+        :param size: 后端实例的数量，默认为 CPU 核心数与 4 中较小的一个
+        :param loop: 事件循环对象
+        """
+
+        self._factory = backend_factory
+        self._size = size or min(os.cpu_count() or 1, 4)
+        self._loop = loop
+        self._workers: list[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._starting: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        """后端实例的数量。"""
+
+        return self._size
+
+    async def start(self) -> None:
+        """启动所有后端实例。"""
+
+        if self._starting is None:
+            loop = self._loop or asyncio.get_running_loop()
+            self._starting = loop.create_task(self._start())
+        await asyncio.shield(self._starting)
+
+    async def _start(self) -> None:
+        loop = self._loop or asyncio.get_running_loop()
+        workers = [_Worker(self._factory()) for _ in range(self._size)]
+        self._workers = workers
+        await asyncio.gather(*(
+            loop.run_in_executor(worker.executor, worker.backend.start)
+            for worker in workers
+        ))
+        self._idle = asyncio.Queue()
+        for worker in workers:
+            self._idle.put_nowait(worker)
+        logger.info(f'{self._size} docx2pdf backends started')
+
+    async def convert(self, docx_file: Path, pdf_file: Path) -> None:
+        """使用一个空闲的后端进行转换。
+
+        :param docx_file: Word 文件的绝对路径
+        :param pdf_file: PDF 文件的绝对路径
+        """
+
+        await self.start()
+        assert self._idle is not None
+        loop = self._loop or asyncio.get_running_loop()
+        worker: Optional[_Worker] = await self._idle.get()
+        if worker is None:
+            # 所有后端都已无法启动，唤醒下一个等待者
+            self._idle.put_nowait(None)
+            raise RuntimeError('no docx2pdf backend is available')
+        usable = True
+        try:
+            await loop.run_in_executor(
+                worker.executor, worker.backend.convert, docx_file, pdf_file
+            )
+        except Exception:
+            # 文件本身有问题时转换程序仍然可用，只有它已经退出或断开连接时
+            # 才重启；重启失败不影响抛出原来的异常
+            alive = await loop.run_in_executor(
+                worker.executor, worker.backend.is_alive
+            )
+            if not alive:
+                usable = await self._restart(worker)
+            raise
+        finally:
+            if usable:
+                self._idle.put_nowait(worker)
+
+    async def _restart(self, worker: _Worker) -> bool:
+        """重启一个已经崩溃的后端，失败时把它移出池。
+
+        :param worker: 需要重启的后端
+        :return: 是否重启成功
+        """
+
+        loop = self._loop or asyncio.get_running_loop()
+        logger.warning('docx2pdf backend is not running, restarting')
+        try:
+            await loop.run_in_executor(
+                worker.executor, self._restart_backend, worker.backend
+            )
+        except Exception as e:
+            logger.error(f'failed to restart docx2pdf backend: {e}')
+            self._workers.remove(worker)
+            worker.executor.shutdown(wait=False)
+            if not self._workers and self._idle is not None:
+                self._idle.put_nowait(None)
+            return False
+        return True
+
+    @staticmethod
+    def _restart_backend(backend: ConverterBackend) -> None:
+        try:
+            backend.stop()
+        except Exception as e:
+            logger.warning(f'failed to stop docx2pdf backend: {e}')
+        backend.start()
+
+    async def close(self) -> None:
+        """关闭所有后端实例。"""
+
+        if self._starting is None:
+            return
+        try:
+            await self._starting
+        except Exception:
+            pass
+        loop = self._loop or asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(worker.executor, worker.backend.stop)
+            for worker in self._workers
+        ), return_exceptions=True)
+        for worker in self._workers:
+            worker.executor.shutdown(wait=False)
+        self._workers = []
+        self._idle = None
+        self._starting = None
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from ..logging import logger
+from ..types import AnyPath
+
+if TYPE_CHECKING:
+    import fitz
+
+
+def _pdf2docx_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version('pdf2docx')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+class LayoutCache:
+    """pdf2docx 页面版面的缓存。
+
+    以页面内容的摘要为键保存 ``Page.store()`` 的结果，同一文件的
+    修订版本再次转换时，只有内容变化的页面需要重新解析。
+    缓存文件总大小超过 ``max_bytes`` 时按最近使用时间淘汰。
+    """
+
+    DEFAULT_DIR = Path.home() / '.cache/pytools/pdf2docx'
+
+    _REF = re.compile(rb'(\d+) 0 R')
+    _PARENT = re.compile(rb'/Parent\s+\d+ 0 R')
+
+    def __init__(
+        self,
+        cache_dir: Optional[AnyPath] = None,
+        *,
+        max_bytes: int = 256 * 1024 ** 2,
+    ) -> None:
+        """初始化。
+
+        :param cache_dir: 缓存目录，默认为 ``~/.cache/pytools/pdf2docx``
+        :param max_bytes: 缓存文件的总大小上限（字节）
+        """
+
+        self._dir = Path(cache_dir) if cache_dir is not None \
+            else self.DEFAULT_DIR
+        self.max_bytes = max_bytes
+        self._version = _pdf2docx_version()
+        self._page_xrefs: tuple[Any, dict[int, int]] = (None, {})
+
+    def __getstate__(self) -> dict:
+        # 缓存会被传给子进程，不传递打开的文档
+        state = self.__dict__.copy()
+        state['_page_xrefs'] = (None, {})
+        return state
+
+    def key(self, page: 'fitz.Page', settings: dict[str, Any]) -> str:
+        """计算页面的缓存键。
+
+        页面对象及其引用的全部对象（内容流、资源中的字体、图片和
+        Form XObject、注释和链接）递归地参与摘要，从父节点继承的资源
+        同样计入；其他页面只记录页码。页面尺寸、旋转和解析参数一并计入，
+        任何一项变化都会得到不同的键。
+
+        :param page: 页面对象
+        :param settings: 解析参数
+        :return: 十六进制摘要
+        """
+
+        doc = page.parent
+        h = hashlib.sha256()
+        h.update(self._version.encode())
+        h.update(json.dumps(settings, sort_keys=True, default=str).encode())
+        h.update(repr((tuple(page.rect), page.rotation)).encode())
+        if self._page_xrefs[0] is not doc:
+            self._page_xrefs = (
+                doc, {doc.page_xref(i): i for i in range(doc.page_count)},
+            )
+        pages = self._page_xrefs[1]
+        seen = set(pages)
+        todo = [page.xref]
+        if doc.xref_get_key(page.xref, 'Resources')[0] == 'null':
+            # 资源从页面树的父节点继承
+            parent = doc.xref_get_key(page.xref, 'Parent')
+            while parent[0] == 'xref':
+                xref = int(parent[1].split()[0])
+                kind, value = doc.xref_get_key(xref, 'Resources')
+                if kind != 'null':
+                    h.update(value.encode())
+                    todo.extend(
+                        int(ref) for ref in self._REF.findall(value.encode())
+                    )
+                    break
+                parent = doc.xref_get_key(xref, 'Parent')
+        while todo:
+            xref = todo.pop()
+            source = self._PARENT.sub(
+                b'', doc.xref_object(xref, compressed=True).encode()
+            )
+            h.update(b'%d\0' % len(source))
+            h.update(source)
+            if doc.xref_is_stream(xref):
+                stream = doc.xref_stream_raw(xref) or b''
+                h.update(b'%d\0' % len(stream))
+                h.update(stream)
+            for ref in map(int, self._REF.findall(source)):
+                if ref in pages and ref != page.xref:
+                    # 链接指向的页面只影响目标页码，不展开其内容
+                    h.update(b'page %d\0' % pages[ref])
+                elif ref not in seen:
+                    seen.add(ref)
+                    todo.append(ref)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._dir / key[:2] / f'{key}.json'
+
+    def get(self, key: str) -> Optional[dict]:
+        """读取缓存的页面数据。
+
+        :param key: 缓存键
+        :return: 页面数据，未命中时返回 None
+        """
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # 修改时间记录最近一次使用，淘汰时据此排序
+            os.utime(path)
+            return data
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, data: dict) -> None:
+        """写入页面数据。
+
+        :param key: 缓存键
+        :param data: ``Page.store()`` 的结果
+        """
+
+        path = self._path(key)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning('failed to write layout cache %s: %s', path, e)
+
+    def evict(self) -> None:
+        """删除最久未使用的缓存文件，直到总大小低于上限的 90%。"""
+
+        entries = []
+        total = 0
+        for path in self._dir.glob('*/*.json'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        logger.info('evicted %d pages from layout cache %s', removed, self._dir)
@@ -0,0 +1,109 @@
+from typing import Optional
+
+from pdf2docx import Converter as _Converter
+from pdf2docx.page.Pages import Pages
+
+from ..logging import logger
+from ..source import open_pdf
+from .cache import LayoutCache
+
+
+class Converter(_Converter):
+    def __init__(
+        self,
+        pdf_file: str,
+        password: Optional[str] = None,
+        cache: Optional[LayoutCache] = None,
+    ) -> None:
+        self.filename_pdf = pdf_file
+        self.password = str(password or '')
+        self._fitz_doc = open_pdf(pdf_file)
+
+        self._pages = Pages()
+        self._cache = cache
+        self._cache_keys: dict[int, str] = {}
+
+    def parse_document(self, **kwargs):
+        """分析文档前先从缓存中恢复未变化的页面，这些页面不再参与解析。"""
+
+        self._cache_keys.clear()
+        if self._cache is not None:
+            for page in self._pages:
+                if page.skip_parsing:
+                    continue
+                index = page.id
+                key = self._cache.key(self._fitz_doc[index], kwargs)
+                data = self._cache.get(key)
+                if data is None:
+                    self._cache_keys[index] = key
+                    continue
+                # 修订版本中页面的位置可能变化
+                page.restore(data).id = index
+                page.skip_parsing = True
+            hits = sum(page.finalized for page in self._pages)
+            if hits:
+                logger.info('%d pages of %s restored from layout cache',
+                            hits, self.filename_pdf)
+        if any(not page.skip_parsing for page in self._pages):
+            super().parse_document(**kwargs)
+        return self
+
+    def parse_pages(self, **kwargs):
+        """解析页面，并将新解析的页面写入缓存。"""
+
+        if any(not page.skip_parsing for page in self._pages):
+            super().parse_pages(**kwargs)
+        if self._cache is not None:
+            for index, key in self._cache_keys.items():
+                page = self._pages[index]
+                if page.finalized:
+                    self._cache.put(key, page.store())
+        return self
+
+
+def parse_docx_pages(
+    pdf_file: str,
+    password: Optional[str],
+    indexes: list[int],
+    cache: Optional[LayoutCache],
+) -> list[dict]:
+    """在子进程中解析一段连续页面的版面。
+
+    :param pdf_file: PDF 文件路径
+    :param password: 文档密码
+    :param indexes: 需要解析的页索引
+    :param cache: 页面版面缓存
+    :return: 解析完成的页面数据
+    """
+
+    converter = Converter(pdf_file, password, cache)
+    try:
+        settings = converter.default_settings
+        converter.load_pages(pages=indexes) \
+            .parse_document(**settings) \
+            .parse_pages(**settings)
+        return [page.store() for page in converter.pages if page.finalized]
+    finally:
+        converter.close()
+
+
+def make_docx(
+    pdf_file: str,
+    password: Optional[str],
+    pages: list[dict],
+    docx_file: str,
+) -> None:
+    """在子进程中合并各分片的解析结果并生成 Word 文件。
+
+    :param pdf_file: PDF 文件路径
+    :param password: 文档密码
+    :param pages: 所有分片解析完成的页面数据
+    :param docx_file: Word 文件的保存路径
+    """
+
+    converter = Converter(pdf_file, password)
+    try:
+        converter.restore({'page_cnt': len(converter.fitz_doc), 'pages': pages})
+        converter.make_docx(docx_file, **converter.default_settings)
+    finally:
+        converter.close()
@@ -1,33 +1,237 @@
 import asyncio
+import os
+import re
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from pathlib import Path
-from typing import Optional
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Callable, Iterable, Optional, Union,
+)
 
 import aiofiles
-import fitz
-import pythoncom
 from aiofiles import os as aos
-from pdf2docx import Converter as _Converter
-from pdf2docx.page.Pages import Pages
-from PIL import Image
-from win32com import client
 
-from ..logging import logger
+from ..logging import Progress, logger
+from ..metrics import Tracker, metrics
+from ..source import digest_file, map_file, open_pdf
 from ..types import AnyPath
+from .backend import ConverterPool
+from .cache import LayoutCache
+from .manifest import PageManifest
+from .pdfwriter import PDFWriter
+from .profile import PDF_PROFILES, ImageProfile, PDFProfile
 
+if TYPE_CHECKING:
+    import fitz
 
-class Converter(_Converter):
-    def __init__(
-        self,
-        pdf_file: str,
-        pdf_data: bytes,
-        password: Optional[str] = None
-    ) -> None:
-        self.filename_pdf = pdf_file
-        self.password = str(password or '')
-        self._fitz_doc = fitz.Document(stream=pdf_data, filetype='pdf')
 
-        self._pages = Pages()
+_worker_pdf: Optional['fitz.Document'] = None
+
+
+def _open_worker_pdf(pdf_file: str) -> None:
+    """渲染子进程的初始化函数，每个子进程只打开一次文档。
+
+    :param pdf_file: PDF 文件路径
+    """
+
+    global _worker_pdf
+    _worker_pdf = open_pdf(pdf_file)
+
+
+def _render_page(
+    index: int,
+    dpi: int,
+    profile: ImageProfile,
+) -> tuple[bytes, float, float]:
+    """在子进程中渲染并编码一页。
+
+    :param index: 页索引
+    :param dpi: 图片的 dpi
+    :param profile: 输出配置
+    :return: (编码后的图片数据, 渲染耗时, 编码耗时)
+    """
+
+    import fitz
+
+    assert _worker_pdf is not None
+    start = time.perf_counter()
+    pixmap = _worker_pdf[index].get_pixmap(
+        dpi=dpi,
+        colorspace=fitz.csGRAY if profile.gray else fitz.csRGB,
+        alpha=False,
+    )
+    rendered = time.perf_counter()
+    imbytes = _encode_pixmap(pixmap, profile)
+    return imbytes, rendered - start, time.perf_counter() - rendered
+
+
+def _encode_pixmap(pixmap: 'fitz.Pixmap', profile: ImageProfile) -> bytes:
+    if profile.format == 'png':
+        return pixmap.tobytes('png')
+    elif profile.format == 'jpeg':
+        return pixmap.tobytes('jpeg', jpg_quality=profile.quality)
+    from PIL import Image
+
+    img = Image.frombytes(
+        'L' if profile.gray else 'RGB',
+        (pixmap.width, pixmap.height),
+        pixmap.samples,
+    )
+    buf = BytesIO()
+    img.save(buf, 'WEBP', quality=profile.quality)
+    return buf.getvalue()
+
+
+def _estimate_page_bytes(
+    pdf: 'fitz.Document',
+    dpi: int,
+    indexes: Iterable[int],
+) -> int:
+    """估算一页渲染后位图所占的内存。
+
+    只读取页面树中的页面尺寸，不加载页面对象。
+
+    :param pdf: PDF 文档对象
+    :param dpi: 图片的 dpi
+    :param indexes: 需要渲染的页索引
+    :return: 所有页面中最大的字节数
+    """
+
+    zoom = dpi / 72
+    return max((
+        int(rect.width * zoom) * int(rect.height * zoom) * 3
+        for rect in map(pdf.page_cropbox, indexes)
+    ), default=0) or 1
+
+
+def _plan_pages(
+    pdf_file: str,
+    profile: ImageProfile,
+    indexes: Optional[list[int]],
+    dpi: Optional[int],
+) -> tuple[list[int], Optional[int]]:
+    """在线程池中打开文档，确定需要渲染的页面并估算单页内存。
+
+    :param pdf_file: PDF 文件路径
+    :param profile: 输出配置
+    :param indexes: 需要渲染的页索引，None 表示由输出配置决定
+    :param dpi: 估算内存使用的 dpi，None 表示不需要估算
+    :return: (页索引, 单页的字节数)
+    """
+
+    with open_pdf(pdf_file) as pdf:
+        if indexes is None:
+            indexes = profile.page_indexes(pdf.page_count)
+        if dpi is None:
+            return indexes, None
+        return indexes, _estimate_page_bytes(pdf, dpi, indexes)
+
+
+def _page_count(pdf_file: str, password: Optional[str]) -> int:
+    """在线程池中打开文档并读取页数。
+
+    :param pdf_file: PDF 文件路径
+    :param password: 文档密码
+    :return: 页数
+    """
+
+    with open_pdf(pdf_file, password) as pdf:
+        return pdf.page_count
+
+
+async def render_pages(
+    pdf_file: AnyPath,
+    *, loop: Optional[asyncio.AbstractEventLoop] = None,
+    dpi: Optional[int] = None,
+    workers: Optional[int] = None,
+    max_inflight_pages: Optional[int] = None,
+    memory_budget: Optional[int] = None,
+    profile: Optional[ImageProfile] = None,
+    indexes: Optional[Iterable[int]] = None,
+    tracker: Optional[Tracker] = None,
+) -> AsyncIterator[tuple[int, bytes]]:
+    """按页序渲染 PDF，逐页产出编码后的图片数据，不写入磁盘。
+
+    渲染、编码在进程池中完成，与使用方之间通过有界队列连接：
+    同时处于渲染中或等待使用方取走的页面数不超过 ``max_inflight_pages``，
+    使用方处理得慢时渲染会暂停，因此内存占用与页数无关。
+
+    :param pdf_file: PDF 文件路径
+    :param loop: 事件循环对象
+    :param dpi: 图片的 dpi
+    :param workers: 渲染进程数，默认为 CPU 核心数
+    :param max_inflight_pages: 同时在内存中的最大页数，默认为渲染进程数的两倍
+    :param memory_budget: 内存预算（字节），根据估算的单页大小限制同时在内存中的页数
+    :param profile: 输出配置，默认为 PNG 格式的 RGB 图片
+    :param indexes: 需要渲染的页索引，默认由输出配置决定
+    :param tracker: 记录渲染、编码耗时和队列深度的对象
+    :return: (页索引, 图片数据) 的异步迭代器
+    """
+
+    async def produce() -> None:
+        for index in _indexes:
+            await inflight.acquire()
+            await queue.put((
+                index,
+                _loop.run_in_executor(pool, _render_page, index, dpi, profile),
+            ))
+        await queue.put(None)
+    _loop = loop or asyncio.get_running_loop()
+    dpi = dpi or 100
+    profile = profile or ImageProfile()
+
+    _indexes = list(indexes) if indexes is not None else None
+    page_bytes = None
+    if _indexes is None or memory_budget is not None:
+        # 长文档的页面树很大，不在事件循环中打开
+        _indexes, page_bytes = await _loop.run_in_executor(
+            None, _plan_pages, str(pdf_file), profile, _indexes,
+            dpi if memory_budget is not None else None,
+        )
+    if not _indexes:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(_indexes))
+    if max_inflight_pages is None:
+        max_inflight_pages = workers * 2
+    if memory_budget is not None and page_bytes is not None:
+        max_inflight_pages = min(max_inflight_pages, memory_budget // page_bytes)
+    max_inflight_pages = max(max_inflight_pages, 1)
+    workers = min(workers, max_inflight_pages)
+    inflight = asyncio.Semaphore(max_inflight_pages)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_inflight_pages)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_open_worker_pdf,
+        initargs=(str(pdf_file),),
+    )
+    producer = _loop.create_task(produce())
+    try:
+        while (item := await queue.get()) is not None:
+            index, fut = item
+            imbytes, render_time, encode_time = await fut
+            if tracker is not None:
+                tracker.observe('render', render_time)
+                tracker.observe('encode', encode_time)
+                tracker.queue_depth(queue.qsize())
+            try:
+                yield index, imbytes
+            finally:
+                # 使用方取走下一页时，上一页才算处理完毕
+                inflight.release()
+    finally:
+        producer.cancel()
+        # 提前结束时取消还在队列中的页面，已经失败的页面读取异常，
+        # 避免事件循环报告未被读取的异常
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is None:
+                continue
+            _, fut = item
+            if not fut.cancel() and not fut.cancelled():
+                fut.exception()
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 async def pdf2img(
@@ -35,42 +239,98 @@ async def pdf2img(
     dest_path: AnyPath,
     *, loop: Optional[asyncio.AbstractEventLoop] = None,
     dpi: Optional[int] = None,
+    workers: Optional[int] = None,
+    max_inflight_pages: Optional[int] = None,
+    memory_budget: Optional[int] = None,
+    profile: Optional[ImageProfile] = None,
+    resume: bool = True,
 ) -> None:
     """实现 PDF 到 图片的转换
 
+    页面由 :func:`render_pages` 渲染，写入在事件循环中完成，
+    内存占用与页数无关。
+
+    已完成的页面记录在输出目录的清单中，再次转换同一文件时，
+    内容摘要、dpi 和输出格式都一致且校验通过的页面会被跳过。
+
     :param pdf_file: PDF 文件路径
     :param dest_path: 转换后的文件的保存路径
     :param loop: 事件循环对象
     :param dpi: 图片的 dpi
+    :param workers: 渲染进程数，默认为 CPU 核心数
+    :param max_inflight_pages: 同时在内存中的最大页数，默认为渲染进程数的两倍
+    :param memory_budget: 内存预算（字节），根据估算的单页大小限制同时在内存中的页数
+    :param profile: 输出配置，默认为 PNG 格式的 RGB 图片
+    :param resume: 是否跳过上次已经完成的页面
     """
 
-    async def convert_page(index: int) -> None:
-        pixmap = pdf[index].get_pixmap(dpi=dpi or 100)
-        imbytes = pixmap.tobytes()
-        page = index + 1
-        save_path = _dest_path / f'page_{page}.png'
-        async with aiofiles.open(save_path, 'wb') as f:
-            await f.write(imbytes)
-        # with open(save_path, 'wb') as f:
-        #     f.write(imbytes)
-        logger.info(f'page {page} of {pdf_file} converted')
     _loop = loop or asyncio.get_running_loop()
     _dest_path = Path(dest_path) / Path(pdf_file).stem
+    dpi = dpi or 100
+    profile = profile or ImageProfile()
 
-    async with aiofiles.open(pdf_file, 'rb') as f:
-        buf = await f.read()
-    pdf = fitz.Document(stream=buf, filetype='pdf')
-    try:
+    with metrics.track('pdf2img', pdf_file) as tracker:
+        with tracker.stage('read'):
+            indexes, _ = await _loop.run_in_executor(
+                None, _plan_pages, str(pdf_file), profile, None, None,
+            )
+        if not indexes:
+            logger.warning('%s has no page to convert', pdf_file)
+            return
         await aos.makedirs(_dest_path, exist_ok=True)
-        page_num = pdf.page_count
-        tasks = [
-            _loop.create_task(convert_page(index)) for index in range(page_num)
-        ]
-        for task in tasks:
-            await task
-        logger.info(f'pdf2img done, result saved at {dest_path}')
-    finally:
-        pdf.close()
+        with tracker.stage('read'):
+            tracker.input((await aos.stat(pdf_file)).st_size)
+            manifest = PageManifest(_dest_path, {
+                'sha256': await _loop.run_in_executor(
+                    None, digest_file, pdf_file
+                ),
+                'dpi': dpi,
+                'format': profile.format,
+                'quality': profile.quality,
+                'gray': profile.gray,
+            })
+        try:
+            await _loop.run_in_executor(None, manifest.load)
+            if resume:
+                indexes = await _loop.run_in_executor(None, lambda: [
+                    index for index in indexes
+                    if not manifest.is_done(index + 1)
+                ])
+                if not indexes:
+                    logger.info(
+                        f'pdf2img done, {pdf_file} is already converted'
+                    )
+                    return
+            pages = render_pages(
+                pdf_file,
+                loop=_loop,
+                dpi=dpi,
+                workers=workers,
+                max_inflight_pages=max_inflight_pages,
+                memory_budget=memory_budget,
+                profile=profile,
+                indexes=indexes,
+                tracker=tracker,
+            )
+            progress = Progress(str(pdf_file), len(indexes))
+            try:
+                async for index, imbytes in pages:
+                    page = index + 1
+                    filename = f'page_{page}{profile.suffix}'
+                    with tracker.stage('write'):
+                        async with aiofiles.open(
+                            _dest_path / filename, 'wb'
+                        ) as f:
+                            await f.write(imbytes)
+                        manifest.record(page, filename, imbytes)
+                    tracker.item(len(imbytes))
+                    progress.update()
+            finally:
+                await pages.aclose()
+            progress.close()
+            logger.info('pdf2img done, result saved at %s', dest_path)
+        finally:
+            manifest.close()
 
 
 async def pdf2docx(
@@ -80,25 +340,145 @@ async def pdf2docx(
     password: Optional[str] = None,
     start: int = 0,
     end: Optional[int] = None,
+    workers: Optional[int] = None,
+    cache: Optional[LayoutCache] = None,
+    use_cache: bool = True,
 ) -> None:
     """实现 PDF 到 Word 的转换
 
+    需要转换的页面按连续区间分片，在进程池中并行解析，
+    最后同样在子进程中合并为一个 Word 文件，不会阻塞事件循环。
+    内容未变化的页面直接使用缓存中的版面，不再重新解析。
+
     :param pdf_file: PDF 文件的路径
     :param dest_path: 转换后文件的保存路径
     :param loop: 事件循环对象
+    :param password: 文档密码
+    :param start: 起始页索引
+    :param end: 结束页索引（不包含），默认到最后一页
+    :param workers: 解析进程数，默认为 CPU 核心数
+    :param cache: 页面版面缓存，默认使用 ``~/.cache/pytools/pdf2docx``
+    :param use_cache: 是否使用页面版面缓存
     """
 
+    from .converter import make_docx, parse_docx_pages
+
     _loop = loop or asyncio.get_running_loop()
     _dest_path = Path(dest_path) / (Path(pdf_file).stem + '.docx')
+    if use_cache:
+        cache = cache or LayoutCache()
+    else:
+        cache = None
+
+    with metrics.track('pdf2docx', pdf_file) as tracker:
+        with tracker.stage('read'):
+            page_count = await _loop.run_in_executor(
+                None, _page_count, str(pdf_file), password,
+            )
+            indexes = list(range(page_count)[start:end])
+            tracker.input((await aos.stat(pdf_file)).st_size)
+        if not indexes:
+            logger.warning('%s has no page to convert', pdf_file)
+            return
+        workers = min(workers or os.cpu_count() or 1, len(indexes))
+        chunk = -(-len(indexes) // workers)
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            with tracker.stage('parse'):
+                shards = await asyncio.gather(*(
+                    _loop.run_in_executor(
+                        pool,
+                        parse_docx_pages,
+                        str(pdf_file), password, indexes[i: i + chunk], cache,
+                    )
+                    for i in range(0, len(indexes), chunk)
+                ))
+            logger.info('%d pages of %s parsed', len(indexes), pdf_file)
+            with tracker.stage('write'):
+                await _loop.run_in_executor(
+                    pool,
+                    make_docx,
+                    str(pdf_file), password,
+                    [page for shard in shards for page in shard],
+                    str(_dest_path),
+                )
+            for _ in indexes:
+                tracker.item()
+            tracker.output((await aos.stat(_dest_path)).st_size)
+            logger.info('pdf2docx done, result saved at %s', dest_path)
+            if cache is not None:
+                await _loop.run_in_executor(None, cache.evict)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+IMAGE_SUFFIXES = frozenset({
+    '.bmp', '.gif', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp',
+})
+
+
+def _natural_key(path: Path) -> list:
+    """自然排序的键，``page_2`` 排在 ``page_10`` 之前。"""
+
+    return [
+        int(part) if part.isdigit() else part.lower()
+        for part in re.split(r'(\d+)', path.name)
+    ]
 
-    async with aiofiles.open(pdf_file, 'rb', loop=_loop) as f:
-        buf = await f.read()
-    converter = Converter(str(pdf_file), buf, password)
-    try:
-        converter.convert(str(_dest_path), start=start, end=end)
-        logger.info(f'pdf2docx done, result saved at {dest_path}')
-    finally:
-        converter.close()
+
+def _timed(func: Callable, *args: Any) -> tuple[Any, float]:
+    """在子进程中执行函数并计时。
+
+    :return: (函数的返回值, 耗时)
+    """
+
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _encode_img(
+    img_file: Path,
+    profile: PDFProfile,
+) -> tuple[Optional[bytes], tuple[int, int], str, str, bool]:
+    """在子进程中把图片处理为可以嵌入 PDF 的数据。
+
+    按配置缩放图片，去除透明通道，再以 JPEG 或无损方式压缩。
+
+    :param img_file: 图片文件路径
+    :param profile: 输出配置
+    :return: (压缩后的数据, 像素尺寸, 图片模式, 压缩方式, 是否带有 Adobe 标记)；
+        JPEG 图片不需要处理时数据为 None，由调用方直接嵌入原始文件
+    """
+
+    from PIL import Image
+
+    with Image.open(img_file) as img:
+        max_size = profile.max_size(img.size)
+        resize = max_size is not None and \
+            (img.size[0] > max_size[0] or img.size[1] > max_size[1])
+        if img.format == 'JPEG' and img.mode in PDFWriter.COLORSPACES \
+            and not resize:
+            return None, img.size, img.mode, 'DCTDecode', 'adobe' in img.info
+        if resize:
+            # JPEG 会在解码时直接缩小，避免解码完整尺寸的图片
+            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        if img.mode in ('RGBA', 'LA', 'PA') or \
+            (img.mode == 'P' and 'transparency' in img.info):
+            # 与白色背景整体合成，一次处理整个像素缓冲区
+            img = img.convert('RGBA')
+            bg = Image.new('RGBA', img.size, (255, 255, 255, 255))
+            img = Image.alpha_composite(bg, img).convert('RGB')
+        elif img.mode not in ('L', 'RGB'):
+            img = img.convert('RGB')
+        if profile.quality is None:
+            return (
+                zlib.compress(img.tobytes()), img.size, img.mode,
+                'FlateDecode', False,
+            )
+        buf = BytesIO()
+        img.save(buf, 'JPEG', quality=profile.quality)
+        return buf.getvalue(), img.size, img.mode, 'DCTDecode', False
 
 
 async def img2pdf(
@@ -106,73 +486,116 @@ async def img2pdf(
     dest_path: AnyPath,
     *,
     loop: Optional[asyncio.AbstractEventLoop] = None,
+    workers: Optional[int] = None,
+    profile: Union[PDFProfile, str, None] = None,
 ) -> None:
     """实现图片到 PDF 的转换
 
+    目录中的图片按文件名自然排序，在进程池中并行解码、去除透明通道，
+    再按顺序逐张写入 PDF 文件；JPEG 图片不经解码直接嵌入。
+    同时在内存中的图片数不超过处理进程数的两倍。
+
     :param imgs_dir: 图片文件目录
     :param dest_path: 转换文件的保存路径
     :param loop: 事件循环对象
+    :param workers: 处理进程数，默认为 CPU 核心数
+    :param profile: 输出配置或其名称（``screen``、``print``、``archive``），
+        默认为 ``archive``
     """
 
-    async def load_img(img_file: AnyPath) -> Image.Image:
-        img_file = Path(img_file)
-        async with aiofiles.open(img_file, 'rb') as f:
-            img_data = await f.read()
-        img = Image.open(BytesIO(img_data))
-        is_png = 0
-        if img_file.suffix == '.png':
-            is_png = 1
-        if is_png:
-            bg = Image.new('RGB', img.size, (255, 255, 255))
-            channels = img.split()
-            bg.paste(img, mask=None if len(channels) < 4 else channels[3])
-            img = bg
-        logger.info(f'{img_file} loaded')
-        return img
+    async def produce() -> None:
+        for img_file in img_files:
+            await queue.put((
+                img_file,
+                _loop.run_in_executor(
+                    pool, _timed, _encode_img, img_file, profile
+                ),
+            ))
+        await queue.put(None)
+
+    async def consume(writer: PDFWriter) -> None:
+        while (item := await queue.get()) is not None:
+            img_file, fut = item
+            (data, size, mode, filter, adobe), encode_time = await fut
+            tracker.observe('encode', encode_time)
+            tracker.queue_depth(queue.qsize())
+            tracker.input((await aos.stat(img_file)).st_size)
+            page_size = profile.page_size_of(size)
+            with tracker.stage('write'):
+                if data is None:
+                    with map_file(img_file) as content:
+                        await writer.add_image_page(
+                            content, size, mode, filter, page_size, adobe
+                        )
+                else:
+                    await writer.add_image_page(
+                        data, size, mode, filter, page_size
+                    )
+            tracker.item()
+            progress.update()
     _loop = loop or asyncio.get_running_loop()
     dest_path = Path(dest_path) / 'output.pdf'
+    if profile is None or isinstance(profile, str):
+        profile = PDF_PROFILES[profile or 'archive']
 
-    tasks = [
-        _loop.create_task(load_img(img_file))
-        for img_file in Path(imgs_dir).iterdir()
-    ]
-    imgs: list[Image.Image] = [await task for task in tasks]
-    pdf = BytesIO()
-    if len(imgs) > 1:
-        imgs[0].save(pdf, 'PDF', save_all=True, append_images=imgs[1:])
-    else:
-        imgs[0].save(pdf, 'PDF')
-    async with aiofiles.open(dest_path, 'wb') as f:
-        await f.write(pdf.getvalue())
-    logger.info(f'img2pdf done, result saved at {dest_path}')
+    with metrics.track('img2pdf', imgs_dir) as tracker:
+        with tracker.stage('read'):
+            img_files = sorted(
+                (
+                    img_file for img_file in Path(imgs_dir).iterdir()
+                    if img_file.suffix.lower() in IMAGE_SUFFIXES
+                    and img_file.is_file()
+                ),
+                key=_natural_key,
+            )
+        if not img_files:
+            logger.warning('no image found in %s', imgs_dir)
+            return
+        workers = min(workers or os.cpu_count() or 1, len(img_files))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            progress = Progress(str(imgs_dir), len(img_files), unit='images')
+            producer = _loop.create_task(produce())
+            try:
+                async with PDFWriter(dest_path) as writer:
+                    await consume(writer)
+            finally:
+                producer.cancel()
+            progress.close()
+            tracker.output((await aos.stat(dest_path)).st_size)
+            logger.info('img2pdf done, result saved at %s', dest_path)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
 
 
 async def docx2pdf(
     docx_file: AnyPath,
     dest_path: AnyPath,
-    *, loop: Optional[asyncio.AbstractEventLoop] = None
+    *, loop: Optional[asyncio.AbstractEventLoop] = None,
+    pool: Optional[ConverterPool] = None,
 ) -> None:
     """实现 Word 到 PDF 的转换
 
-    :param docx_file: Word 文件的路径，需要绝对路径
-    :param dest_path: 转换文件的保存路径，需要绝对路径
+    :param docx_file: Word 文件的路径
+    :param dest_path: 转换文件的保存路径
     :param loop: 事件循环对象
+    :param pool: 转换后端池，默认临时启动一个平台默认的后端，转换完成后关闭
     """
 
-    def convert() -> None:
-        pythoncom.CoInitialize()
-        word = client.Dispatch('Word.Application')
-        try:
-            doc = word.Documents.Open(str(docx_file))
-            try:
-                doc.SaveAs(str(_dest_path), FileFormat=17)
-                logger.info(f'docx2pdf done, result saved at {_dest_path}')
-            finally:
-                doc.Close(0)
-        finally:
-            word.Quit()
-            pythoncom.CoUninitialize()
     _loop = loop or asyncio.get_running_loop()
-    _dest_path = Path(dest_path) / (Path(docx_file).stem + '.pdf')
+    _dest_path = Path(dest_path).resolve() / (Path(docx_file).stem + '.pdf')
 
-    await _loop.run_in_executor(None, convert)
+    with metrics.track('docx2pdf', docx_file) as tracker:
+        tracker.input((await aos.stat(docx_file)).st_size)
+        with tracker.stage('convert'):
+            if pool is None:
+                pool = ConverterPool(size=1, loop=_loop)
+                try:
+                    await pool.convert(Path(docx_file).resolve(), _dest_path)
+                finally:
+                    await pool.close()
+            else:
+                await pool.convert(Path(docx_file).resolve(), _dest_path)
+        tracker.item((await aos.stat(_dest_path)).st_size)
+    logger.info('docx2pdf done, result saved at %s', _dest_path)
@@ -0,0 +1,103 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+from ..logging import logger
+
+
+class PageManifest:
+    """pdf2img 的逐页清单，记录已完成的页面以便中断后继续转换。
+
+    清单以 JSON Lines 格式保存在输出目录中：第一行是转换参数，
+    之后每完成一页追加一行，进程异常退出时最多丢失最后一行。
+    """
+
+    FILENAME = 'manifest.jsonl'
+
+    def __init__(self, dest_dir: Path, key: dict[str, Any]) -> None:
+        """初始化。
+
+        :param dest_dir: 图片的保存目录
+        :param key: 转换参数，包括输入文件摘要、dpi 和输出格式
+        """
+
+        self._dir = dest_dir
+        self._path = dest_dir / self.FILENAME
+        self._key = key
+        self._pages: dict[int, dict[str, Any]] = {}
+        self._file = None
+
+    def load(self) -> None:
+        """读取已有清单，参数不一致时丢弃旧记录。"""
+
+        self._pages.clear()
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+        if lines and self._parse(lines[0]) == {'key': self._key}:
+            for line in lines[1:]:
+                record = self._parse(line)
+                if record is not None and 'page' in record:
+                    self._pages[record['page']] = record
+        else:
+            if lines:
+                logger.info('%s is stale, start over', self._path)
+            with open(self._path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'key': self._key}) + '\n')
+        self._file = open(self._path, 'a', encoding='utf-8')
+
+    @staticmethod
+    def _parse(line: str) -> Optional[dict]:
+        try:
+            return json.loads(line)
+        except ValueError:
+            # 进程中断时写了一半的行
+            return None
+
+    def is_done(self, page: int) -> bool:
+        """检查某一页是否已经转换完成且输出文件未被改动。
+
+        :param page: 页码
+        :return: 是否可以跳过
+        """
+
+        record = self._pages.get(page)
+        if record is None:
+            return False
+        path = self._dir / record['file']
+        try:
+            if path.stat().st_size != record['size']:
+                return False
+            return hashlib.sha256(path.read_bytes()).hexdigest() \
+                == record['sha256']
+        except OSError:
+            return False
+
+    def record(self, page: int, filename: str, data: bytes) -> None:
+        """记录已完成的一页。
+
+        :param page: 页码
+        :param filename: 输出文件名
+        :param data: 写入的文件内容
+        """
+
+        assert self._file is not None
+        record = {
+            'page': page,
+            'file': filename,
+            'size': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+        }
+        self._pages[page] = record
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        """关闭清单文件。"""
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
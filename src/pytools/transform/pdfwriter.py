@@ -0,0 +1,199 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+
+from ..types import AnyPath, ReadableBuffer
+
+
+# 进程的 umask 只能通过设置来读取，在导入时读取一次
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class PDFWriter:
+    """逐页追加图片的 PDF 写入器。
+
+    每添加一页就把图片、内容流和页面对象写入文件，只在内存中保留
+    各对象的偏移量，因此内存占用与页数无关。内容先写入同一目录下的
+    临时文件，成功关闭后才替换目标文件，出错时删除临时文件。
+    """
+
+    CATALOG = 1
+    PAGES = 2
+    COLORSPACES = {
+        'L': b'/DeviceGray',
+        'RGB': b'/DeviceRGB',
+        'CMYK': b'/DeviceCMYK',
+    }
+
+    def __init__(self, path: AnyPath) -> None:
+        """初始化。
+
+        :param path: PDF 文件的保存路径
+        """
+
+        self._path = Path(path)
+        self._tmp_path: Optional[str] = None
+        self._file = None
+        self._pos = 0
+        # 对象号从 1 开始，前两个对象留给目录和页面树
+        self._offsets: list[int] = [0, 0]
+        self._kids: list[int] = []
+
+    async def __aenter__(self) -> 'PDFWriter':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.abort()
+
+    @property
+    def page_count(self) -> int:
+        """已写入的页数。"""
+
+        return len(self._kids)
+
+    async def open(self) -> None:
+        """创建文件并写入文件头。"""
+
+        # 临时文件名在同一进程中也是唯一的，写入同一目标的多个对象互不影响
+        fd, self._tmp_path = tempfile.mkstemp(
+            suffix='.tmp', prefix=f'.{self._path.stem}.', dir=self._path.parent,
+        )
+        # mkstemp 创建的文件只有所有者可读写，改为与普通新建文件相同的权限
+        os.chmod(fd, 0o666 & ~_UMASK)
+        self._file = await aiofiles.open(fd, 'wb')
+        await self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    async def _write(self, data: ReadableBuffer) -> None:
+        assert self._file is not None
+        await self._file.write(data)
+        self._pos += len(data)
+
+    def _alloc(self) -> int:
+        self._offsets.append(0)
+        return len(self._offsets)
+
+    async def _write_object(
+        self,
+        num: int,
+        body: bytes,
+        stream: Optional[ReadableBuffer] = None,
+    ) -> None:
+        self._offsets[num - 1] = self._pos
+        await self._write(b'%d 0 obj\n' % num)
+        if stream is None:
+            await self._write(body + b'\nendobj\n')
+            return
+        await self._write(b'<<%s /Length %d>>\nstream\n' % (body, len(stream)))
+        await self._write(stream)
+        await self._write(b'\nendstream\nendobj\n')
+
+    async def add_image_page(
+        self,
+        data: ReadableBuffer,
+        size: tuple[int, int],
+        mode: str,
+        filter: str,
+        page_size: Optional[tuple[float, float]] = None,
+        adobe: bool = False,
+    ) -> None:
+        """添加一页，页面内容为铺满整页的一张图片。
+
+        :param data: 已编码的图片数据，JPEG 文件可以直接传入
+        :param size: 图片的像素尺寸
+        :param mode: 图片模式，``L``、``RGB`` 或 ``CMYK``
+        :param filter: 图片数据的编码，``DCTDecode`` 或 ``FlateDecode``
+        :param page_size: 页面尺寸（pt），默认每像素 1pt
+        :param adobe: JPEG 是否带有 Adobe 标记，带有标记的 CMYK JPEG
+            以反相的数值存储
+        """
+
+        width, height = size
+        page_width, page_height = page_size or size
+        image_num = self._alloc()
+        content_num = self._alloc()
+        page_num = self._alloc()
+        decode = b''
+        if mode == 'CMYK' and filter == 'DCTDecode' and adobe:
+            decode = b' /Decode [1 0 1 0 1 0 1 0]'
+        await self._write_object(
+            image_num,
+            b'/Type /XObject /Subtype /Image /Width %d /Height %d '
+            b'/ColorSpace %s /BitsPerComponent 8 /Filter /%s%s' % (
+                width, height, self.COLORSPACES[mode], filter.encode(), decode
+            ),
+            data,
+        )
+        await self._write_object(
+            content_num,
+            b'',
+            b'q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q' % (page_width, page_height),
+        )
+        await self._write_object(
+            page_num,
+            b'<</Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources <</XObject <</Im0 %d 0 R>>>> /Contents %d 0 R>>' % (
+                self.PAGES, page_width, page_height, image_num, content_num
+            ),
+        )
+        self._kids.append(page_num)
+
+    async def close(self) -> None:
+        """写入页面树、目录和交叉引用表，关闭文件并替换目标文件。"""
+
+        if self._file is None:
+            return
+        try:
+            await self._finish()
+        except BaseException:
+            await self.abort()
+            raise
+        assert self._tmp_path is not None
+        os.replace(self._tmp_path, self._path)
+        self._tmp_path = None
+
+    async def abort(self) -> None:
+        """关闭并删除临时文件，目标文件保持不变。"""
+
+        if self._file is not None:
+            await self._file.close()
+            self._file = None
+        if self._tmp_path is None:
+            return
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
+        self._tmp_path = None
+
+    async def _finish(self) -> None:
+        assert self._file is not None
+        kids = b' '.join(b'%d 0 R' % num for num in self._kids)
+        await self._write_object(
+            self.PAGES,
+            b'<</Type /Pages /Kids [%s] /Count %d>>' % (kids, len(self._kids)),
+        )
+        await self._write_object(
+            self.CATALOG,
+            b'<</Type /Catalog /Pages %d 0 R>>' % self.PAGES,
+        )
+        xref = self._pos
+        size = len(self._offsets) + 1
+        await self._write(b'xref\n0 %d\n0000000000 65535 f \n' % size)
+        await self._write(b''.join(
+            b'%010d 00000 n \n' % offset for offset in self._offsets
+        ))
+        await self._write(
+            b'trailer\n<</Size %d /Root %d 0 R>>\nstartxref\n%d\n%%%%EOF\n' % (
+                size, self.CATALOG, xref
+            )
+        )
+        await self._file.close()
+        self._file = None
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ImageProfile:
+    """pdf2img 的输出配置。"""
+
+    #: 输出格式，``png``、``jpeg`` 或 ``webp``
+    format: str = 'png'
+    #: 有损格式的压缩质量，1-100
+    quality: int = 85
+    #: 是否输出灰度图，否则输出不带 alpha 通道的 RGB 图
+    gray: bool = False
+    #: 需要转换的页，例如 ``'1-3,5'``，从 1 开始计数，默认全部
+    pages: Optional[str] = None
+
+    FORMATS = {'png': '.png', 'jpeg': '.jpg', 'webp': '.webp'}
+
+    def __post_init__(self) -> None:
+        if self.format not in self.FORMATS:
+            raise ValueError(f'unsupported image format: {self.format}')
+        if not 0 < self.quality <= 100:
+            raise ValueError(f'quality should be in [1, 100], got {self.quality}')
+
+    @property
+    def suffix(self) -> str:
+        """输出文件的后缀名。"""
+
+        return self.FORMATS[self.format]
+
+    def page_indexes(self, page_count: int) -> list[int]:
+        """解析需要转换的页。
+
+        :param page_count: 文档的总页数
+        :return: 从 0 开始计数的有序页索引
+        """
+
+        if not self.pages:
+            return list(range(page_count))
+        indexes = set()
+        for part in self.pages.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            start, sep, stop = part.partition('-')
+            first = int(start) if start.strip() else 1
+            last = (int(stop) if stop.strip() else page_count) if sep else first
+            if first < 1 or last < first:
+                raise ValueError(f'invalid page range: {part}')
+            indexes.update(range(first - 1, min(last, page_count)))
+        return sorted(indexes)
+
+
+@dataclass(frozen=True)
+class PDFProfile:
+    """img2pdf 的输出配置。"""
+
+    #: 图片在页面上的最大分辨率，None 表示保持原始分辨率，每像素 1pt
+    dpi: Optional[int] = None
+    #: 页面尺寸（pt），方向随图片自动调整，默认 A4
+    page_size: tuple[float, float] = (595.0, 842.0)
+    #: JPEG 压缩质量，None 表示无损保存，JPEG 输入不缩放时直接嵌入
+    quality: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.quality is not None and not 0 < self.quality <= 100:
+            raise ValueError(f'quality should be in [1, 100], got {self.quality}')
+
+    def _page_box(self, size: tuple[int, int]) -> tuple[float, float]:
+        width, height = self.page_size
+        if (size[0] > size[1]) != (width > height):
+            width, height = height, width
+        return width, height
+
+    def max_size(self, size: tuple[int, int]) -> Optional[tuple[int, int]]:
+        """计算图片缩放后允许的最大像素尺寸。
+
+        :param size: 图片的原始像素尺寸
+        :return: 最大像素尺寸，不需要缩放时返回 None
+        """
+
+        if self.dpi is None:
+            return None
+        width, height = self._page_box(size)
+        return int(width / 72 * self.dpi), int(height / 72 * self.dpi)
+
+    def page_size_of(self, size: tuple[int, int]) -> Optional[tuple[float, float]]:
+        """计算图片所在页面的尺寸，图片保持宽高比放入页面。
+
+        :param size: 图片的像素尺寸
+        :return: 页面尺寸（pt），None 表示每像素 1pt
+        """
+
+        if self.dpi is None:
+            return None
+        width, height = self._page_box(size)
+        scale = min(width / size[0], height / size[1])
+        return size[0] * scale, size[1] * scale
+
+
+PDF_PROFILES = {
+    # 屏幕阅读，文件最小
+    'screen': PDFProfile(dpi=96, quality=60),
+    # 打印
+    'print': PDFProfile(dpi=300, quality=85),
+    # 归档，保持原始分辨率且不做有损压缩
+    'archive': PDFProfile(),
+}
@@ -0,0 +1,214 @@
+import asyncio
+import heapq
+import itertools
+from enum import Enum
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from ..logging import logger
+from ..types import AnyPath
+
+
+class JobState(str, Enum):
+    """任务状态。"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+
+class Job:
+    """一个待转换的文件。"""
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        file: AnyPath,
+        dest_path: AnyPath,
+        type: Hashable,
+        options: dict[str, Any],
+        priority: int,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        self.id = next(self._ids)
+        self.file = file
+        self.dest_path = dest_path
+        self.type = type
+        self.options = options
+        self.priority = priority
+        self.state = JobState.PENDING
+        #: 持久化记录的 id，没有使用任务队列时为 None
+        self.record_id: Optional[int] = None
+        #: 任务结束时完成，失败时包含异常，取消时被取消；
+        #: 直接取消 future 与调用 :meth:`cancel` 的效果相同
+        self.future: asyncio.Future = loop.create_future()
+        self._task: Optional[asyncio.Task] = None
+
+    def __repr__(self) -> str:
+        return f'<Job {self.id} {self.type!r} {self.file} {self.state.value}>'
+
+    def cancel(self) -> bool:
+        """取消任务，正在运行的任务会在下一个等待点被取消。
+
+        :return: 任务已经结束时返回 False
+        """
+
+        if self.state is JobState.PENDING:
+            self.state = JobState.CANCELLED
+            self.future.cancel()
+            return True
+        if self.state is JobState.RUNNING and self._task is not None:
+            return self._task.cancel()
+        return False
+
+
+class Scheduler:
+    """并发执行转换任务。
+
+    同时运行的任务数受全局上限和每种转换类型的上限共同限制，
+    等待中的任务按优先级（数值越大越先执行）和提交顺序依次启动。
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Job], Awaitable[None]],
+        *,
+        concurrency: int,
+        type_limits: Optional[dict[Hashable, int]] = None,
+        on_finish: Optional[Callable[[Job], None]] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        """初始化。
+
+        :param runner: 执行单个任务的协程函数
+        :param concurrency: 同时运行的任务数上限
+        :param type_limits: 每种转换类型同时运行的任务数上限，未列出的类型只受全局上限限制
+        :param on_finish: 任务进入完成、失败或取消状态后调用，
+            正在运行的任务在实际停止后才调用
+        :param loop: 事件循环对象
+        """
+
+        self._runner = runner
+        self._on_finish = on_finish
+        self._concurrency = concurrency
+        self._type_limits = dict(type_limits or {})
+        self._loop = loop if loop is not None else asyncio.get_event_loop()
+        self._seq = itertools.count()
+        self._pending: list[tuple[int, int, Job]] = []
+        self._running: dict[Hashable, int] = {}
+        self._active: set[Job] = set()
+
+    @property
+    def running(self) -> int:
+        """正在运行的任务数。"""
+
+        return sum(self._running.values())
+
+    @property
+    def pending(self) -> int:
+        """等待中的任务数。"""
+
+        return sum(
+            job.state is JobState.PENDING for _, _, job in self._pending
+        )
+
+    def submit(
+        self,
+        file: AnyPath,
+        dest_path: AnyPath,
+        type: Hashable,
+        *,
+        priority: int = 0,
+        **options: Any,
+    ) -> Job:
+        """提交一个任务。
+
+        :param file: 需要转换的文件
+        :param dest_path: 转换后的文件的保存位置
+        :param type: 转换类型
+        :param priority: 优先级，数值越大越先执行
+        :param options: 传递给转换函数的参数
+        :return: 任务对象
+        """
+
+        job = Job(file, dest_path, type, options, priority, self._loop)
+        job.future.add_done_callback(lambda _: self._future_done(job))
+        heapq.heappush(self._pending, (-priority, next(self._seq), job))
+        self._dispatch()
+        return job
+
+    def _has_capacity(self, type: Hashable) -> bool:
+        limit = self._type_limits.get(type)
+        return limit is None or self._running.get(type, 0) < limit
+
+    def _dispatch(self) -> None:
+        skipped = []
+        while self._pending and self.running < self._concurrency:
+            item = heapq.heappop(self._pending)
+            job = item[2]
+            if job.state is not JobState.PENDING:
+                continue
+            if not self._has_capacity(job.type):
+                skipped.append(item)
+                continue
+            self._start(job)
+        for item in skipped:
+            heapq.heappush(self._pending, item)
+
+    def _start(self, job: Job) -> None:
+        job.state = JobState.RUNNING
+        self._running[job.type] = self._running.get(job.type, 0) + 1
+        self._active.add(job)
+        job._task = self._loop.create_task(self._runner(job))
+        job._task.add_done_callback(lambda task: self._finish(job, task))
+
+    def _future_done(self, job: Job) -> None:
+        """调用方取消了 future，例如等待它的 gather 被取消，同时取消任务。"""
+
+        if not job.future.cancelled():
+            return
+        if job._task is not None:
+            # 运行中的任务停止后由 _finish 处理
+            job._task.cancel()
+            return
+        job.state = JobState.CANCELLED
+        if self._on_finish is not None:
+            self._on_finish(job)
+
+    def _finish(self, job: Job, task: asyncio.Task) -> None:
+        self._running[job.type] -= 1
+        self._active.discard(job)
+        # 状态取决于任务实际的结果，future 被取消时任务可能已经完成
+        if task.cancelled():
+            job.state = JobState.CANCELLED
+            job.future.cancel()
+        elif (exc := task.exception()) is not None:
+            job.state = JobState.FAILED
+            logger.error('failed to transform %s: %r', job.file, exc)
+            if not job.future.done():
+                job.future.set_exception(exc)
+        else:
+            job.state = JobState.DONE
+            if not job.future.done():
+                job.future.set_result(None)
+        if self._on_finish is not None:
+            self._on_finish(job)
+        self._dispatch()
+
+    async def shutdown(self) -> None:
+        """取消所有任务，并等待正在运行的任务停止。"""
+
+        tasks = [job._task for job in self._active if job._task is not None]
+        self.cancel_all()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def cancel_all(self) -> None:
+        """取消所有等待中和正在运行的任务。"""
+
+        for _, _, job in self._pending:
+            job.cancel()
+        self._pending.clear()
+        for job in tuple(self._active):
+            job.cancel()
@@ -0,0 +1,209 @@
+import dataclasses
+import json
+import sqlite3
+import time
+from typing import Any, NamedTuple, Optional
+
+from ..logging import logger
+from ..types import AnyPath
+from .profile import ImageProfile, PDFProfile
+from .scheduler import JobState
+
+#: 可以保存在任务参数中的配置类型
+_OPTION_TYPES = {cls.__name__: cls for cls in (ImageProfile, PDFProfile)}
+
+
+def _encode_option(value: Any) -> dict[str, Any]:
+    if type(value).__name__ in _OPTION_TYPES and dataclasses.is_dataclass(value):
+        return {'__type__': type(value).__name__, **dataclasses.asdict(value)}
+    raise TypeError(
+        f'option of type {type(value).__name__} can not be stored in a job queue'
+    )
+
+
+def _decode_option(obj: dict[str, Any]) -> Any:
+    name = obj.pop('__type__', None)
+    if name is None:
+        return obj
+    # JSON 中没有元组，例如 PDFProfile.page_size
+    return _OPTION_TYPES[name](**{
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in obj.items()
+    })
+
+
+class JobRecord(NamedTuple):
+    """持久化的任务记录。"""
+
+    id: int
+    file: str
+    dest_path: str
+    type: int
+    options: dict[str, Any]
+    priority: int
+    state: JobState
+    attempts: int
+
+
+class JobStore:
+    """基于 SQLite 的任务队列，记录每个任务的状态和尝试次数。
+
+    进程退出后，未完成的任务可以在下次启动时恢复执行。
+    """
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        file TEXT NOT NULL,
+        dest_path TEXT NOT NULL,
+        type INTEGER NOT NULL,
+        options TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        state TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        created REAL NOT NULL,
+        updated REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+    '''
+
+    def __init__(self, path: AnyPath) -> None:
+        """初始化。
+
+        :param path: 数据库文件路径
+        """
+
+        self._db = sqlite3.connect(str(path))
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(self.SCHEMA)
+
+    def add(
+        self,
+        file: str,
+        dest_path: str,
+        type: int,
+        options: dict[str, Any],
+        priority: int = 0,
+    ) -> int:
+        """添加一个等待中的任务。
+
+        参数以 JSON 保存，除基本类型外只支持 :class:`ImageProfile`
+        和 :class:`PDFProfile`，其他类型会引发 TypeError。
+
+        :return: 记录的 id
+        """
+
+        now = time.time()
+        with self._db:
+            cur = self._db.execute(
+                'INSERT INTO jobs (file, dest_path, type, options, priority, '
+                'state, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (file, dest_path, int(type),
+                 json.dumps(options, default=_encode_option), priority,
+                 JobState.PENDING.value, now, now),
+            )
+        assert cur.lastrowid is not None
+        return cur.lastrowid
+
+    def mark(self, id: int, state: JobState, error: str = '') -> None:
+        """更新任务状态，进入运行状态时尝试次数加一。
+
+        :param id: 记录的 id
+        :param state: 新的状态
+        :param error: 失败原因
+        """
+
+        with self._db:
+            self._db.execute(
+                'UPDATE jobs SET state = ?, error = ?, updated = ?, '
+                'attempts = attempts + ? WHERE id = ?',
+                (state.value, error or None, time.time(),
+                 int(state is JobState.RUNNING), id),
+            )
+
+    def requeue(self, id: int) -> None:
+        """把正常退出时被取消的任务放回等待状态。
+
+        被中断的这次运行不计入尝试次数。
+
+        :param id: 记录的 id
+        """
+
+        with self._db:
+            self._db.execute(
+                'UPDATE jobs SET state = ?, updated = ?, '
+                'attempts = attempts - (state = ?) '
+                'WHERE id = ? AND state IN (?, ?)',
+                (JobState.PENDING.value, time.time(), JobState.RUNNING.value,
+                 id, JobState.PENDING.value, JobState.RUNNING.value),
+            )
+
+    def unfinished(self, max_attempts: int) -> list[JobRecord]:
+        """获取上次没有完成的任务。
+
+        进程崩溃时正在运行的任务仍处于运行状态，会被重新执行；
+        失败的任务同样会被重试。尝试次数达到上限的任务不再返回，
+        避免反复失败或导致崩溃的文件一直重试。
+
+        :param max_attempts: 最大尝试次数
+        :return: 按提交顺序排列的任务记录
+        """
+
+        rows = self._db.execute(
+            'SELECT id, file, dest_path, type, options, priority, state, '
+            'attempts FROM jobs WHERE state IN (?, ?, ?) AND attempts < ? '
+            'ORDER BY id',
+            (JobState.PENDING.value, JobState.RUNNING.value,
+             JobState.FAILED.value, max_attempts),
+        ).fetchall()
+        records = []
+        for id, file, dest_path, type, options, priority, state, attempts \
+                in rows:
+            decoded = self._decode_options(id, options, max_attempts)
+            if decoded is not None:
+                records.append(JobRecord(
+                    id, file, dest_path, type, decoded,
+                    priority, JobState(state), attempts,
+                ))
+        return records
+
+    def _decode_options(
+        self,
+        id: int,
+        options: Any,
+        max_attempts: int,
+    ) -> Optional[dict]:
+        """解析任务参数。
+
+        无法解析的记录标记为失败，并把尝试次数记为上限，不再被重试。
+        """
+
+        try:
+            return json.loads(options, object_hook=_decode_option)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning('job %d has unreadable options: %r', id, e)
+            with self._db:
+                self._db.execute(
+                    'UPDATE jobs SET state = ?, error = ?, updated = ?, '
+                    'attempts = MAX(attempts, ?) WHERE id = ?',
+                    (JobState.FAILED.value, f'unreadable options: {e!r}',
+                     time.time(), max_attempts, id),
+                )
+            return None
+
+    def counts(self) -> dict[JobState, int]:
+        """统计各状态的任务数。"""
+
+        return {
+            JobState(state): count
+            for state, count in self._db.execute(
+                'SELECT state, COUNT(*) FROM jobs GROUP BY state'
+            )
+        }
+
+    def close(self) -> None:
+        """关闭数据库。"""
+
+        self._db.close()
@@ -1,3 +1,5 @@
+from mmap import mmap
 from typing import Union
 from pathlib import Path
 AnyPath = Union[Path, str]
+ReadableBuffer = Union[bytes, bytearray, memoryview, mmap]
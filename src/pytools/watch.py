@@ -0,0 +1,353 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import sqlite3
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+import aiofiles
+
+from .logging import logger
+from .transform import IMAGE_SUFFIXES, Transformer, TransformType
+from .types import AnyPath
+
+if TYPE_CHECKING:
+    from .OCR import Recognizer
+
+OCR = 'ocr'
+
+
+class WatchRule(NamedTuple):
+    """监控规则：目录中出现的新文件交给哪种转换处理，结果保存在哪里。"""
+
+    path: Path
+    action: Union[TransformType, str]
+    dest_path: Path
+
+    @property
+    def suffixes(self) -> frozenset[str]:
+        """该规则处理的文件后缀。"""
+
+        if self.action is TransformType.DOCX2PDF:
+            return frozenset({'.doc', '.docx'})
+        if self.action == OCR:
+            return IMAGE_SUFFIXES | {'.pdf'}
+        return frozenset({'.pdf'})
+
+
+class ProcessedIndex:
+    """已处理文件的索引，以路径、大小和修改时间判断文件是否处理过。"""
+
+    DEFAULT_PATH = Path.home() / '.cache/pytools/watch.db'
+
+    def __init__(self, path: Optional[AnyPath] = None) -> None:
+        """初始化。
+
+        :param path: 数据库文件路径，默认为 ``~/.cache/pytools/watch.db``
+        """
+
+        path = Path(path) if path is not None else self.DEFAULT_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path))
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS processed ('
+            'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+            'processed REAL)'
+        )
+
+    def contains(self, path: Path, stat: os.stat_result) -> bool:
+        """文件的当前版本是否已经处理过。"""
+
+        row = self._db.execute(
+            'SELECT size, mtime_ns FROM processed WHERE path = ?',
+            (str(path),),
+        ).fetchone()
+        return row == (stat.st_size, stat.st_mtime_ns)
+
+    def add(self, path: Path, stat: os.stat_result) -> None:
+        """记录已经处理的文件。"""
+
+        with self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?)',
+                (str(path), stat.st_size, stat.st_mtime_ns, time.time()),
+            )
+
+    def close(self) -> None:
+        """关闭数据库。"""
+
+        self._db.close()
+
+
+class _Inotify:
+    """通过 ctypes 调用 Linux 的 inotify。"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith('linux'):
+            raise OSError('inotify is only available on Linux')
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs: dict[int, Path] = {}
+
+    def add_watch(self, path: Path) -> None:
+        wd = self._libc.inotify_add_watch(
+            self.fd,
+            os.fsencode(path),
+            self.IN_CLOSE_WRITE | self.IN_MOVED_TO,
+        )
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'failed to watch {path}')
+        self._dirs[wd] = path
+
+    def read(self) -> tuple[list[Path], bool]:
+        """读取所有待处理事件。
+
+        :return: (发生变化的文件, 事件队列是否溢出)，溢出时有事件已经丢失
+        """
+
+        paths = []
+        overflow = False
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return paths, overflow
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = self.EVENT.unpack_from(buf, offset)
+                offset += self.EVENT.size
+                name = buf[offset: offset + length].rstrip(b'\0')
+                offset += length
+                if wd == -1 and mask & self.IN_Q_OVERFLOW:
+                    overflow = True
+                elif wd in self._dirs and name:
+                    paths.append(self._dirs[wd] / os.fsdecode(name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Watcher:
+    """监控目录，自动转换或识别新出现的文件。
+
+    每隔 ``poll_interval`` 秒扫描一次所有目录；Linux 下同时使用 inotify
+    及时发现本机写入的文件。网络共享目录上 inotify 收不到其他机器的写入，
+    目录的修改时间也可能不准确，因此扫描不依赖这两者。
+    文件大小和修改时间在 ``settle`` 秒内不再变化才会被处理，避免处理
+    尚未写完的文件；处理过的文件记录在索引中，重启后不会重复处理。
+    只监控目录本身，不包含子目录。
+    """
+
+    def __init__(
+        self,
+        rules: list[WatchRule],
+        *,
+        transformer: Transformer,
+        recognizer: Optional['Recognizer'] = None,
+        index: Optional[ProcessedIndex] = None,
+        settle: float = 2.0,
+        poll_interval: float = 5.0,
+        use_inotify: bool = True,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        """初始化。
+
+        :param rules: 监控规则
+        :param transformer: 执行转换任务的对象
+        :param recognizer: 执行文字识别的对象，有 OCR 规则时必须提供
+        :param index: 已处理文件的索引
+        :param settle: 文件保持不变多少秒后才被处理
+        :param poll_interval: 定期扫描目录的间隔
+        :param use_inotify: 是否尝试使用 inotify
+        :param loop: 事件循环对象
+        """
+
+        for rule in rules:
+            if rule.action is TransformType.IMG2PDF:
+                raise ValueError('img2pdf takes directories and can not be watched')
+            if rule.action == OCR and recognizer is None:
+                raise ValueError('a recognizer is required by OCR rules')
+        self._rules = {rule.path.resolve(): rule for rule in rules}
+        self._transformer = transformer
+        self._recognizer = recognizer
+        self._index = index or ProcessedIndex()
+        self._settle = settle
+        self._poll_interval = poll_interval
+        self._use_inotify = use_inotify
+        self._loop = loop if loop is not None else asyncio.get_event_loop()
+        # 等待稳定的文件：路径 -> (大小, 修改时间, 开始保持不变的时间)
+        self._candidates: dict[Path, tuple[int, int, float]] = {}
+        # 已提交但尚未完成的文件
+        self._dispatched: set[Path] = set()
+        # 已知无需处理的文件：路径 -> (大小, 修改时间)，避免重复查询索引
+        self._known: dict[Path, tuple[int, int]] = {}
+        self._wakeup = asyncio.Event()
+
+    def _match(self, path: Path) -> Optional[WatchRule]:
+        rule = self._rules.get(path.parent)
+        if rule is None or path.suffix.lower() not in rule.suffixes:
+            return None
+        return rule
+
+    def _offer(self, path: Path) -> None:
+        """把可能需要处理的文件加入等待队列。"""
+
+        if path in self._dispatched or self._match(path) is None:
+            return
+        self._candidates.setdefault(path, (-1, -1, 0.0))
+        self._wakeup.set()
+
+    def _scan(self, directory: Path) -> None:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            logger.warning(f'failed to scan {directory}: {e}')
+            return
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            path = Path(entry.path)
+            if self._match(path) is None:
+                continue
+            stat = entry.stat()
+            version = (stat.st_size, stat.st_mtime_ns)
+            if self._known.get(path) == version:
+                continue
+            if self._index.contains(path, stat):
+                self._known[path] = version
+                continue
+            self._offer(path)
+
+    def _rescan(self) -> None:
+        """扫描所有目录，已知的文件由 ``_known`` 过滤，不会重复查询索引。"""
+
+        for directory in self._rules:
+            self._scan(directory)
+
+    def _settled(self) -> list[tuple[Path, os.stat_result]]:
+        """检查等待队列，返回已经稳定的文件。"""
+
+        now = time.monotonic()
+        ready = []
+        for path, (size, mtime, since) in list(self._candidates.items()):
+            try:
+                stat = path.stat()
+            except OSError:
+                # 文件被删除或移走
+                del self._candidates[path]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                self._candidates[path] = (stat.st_size, stat.st_mtime_ns, now)
+                continue
+            if now - since < self._settle:
+                continue
+            del self._candidates[path]
+            if not self._index.contains(path, stat):
+                ready.append((path, stat))
+        return ready
+
+    def _dispatch(self, path: Path, stat: os.stat_result) -> None:
+        rule = self._match(path)
+        assert rule is not None
+        self._dispatched.add(path)
+        if rule.action == OCR:
+            task = self._loop.create_task(self._ocr(path, rule.dest_path))
+        else:
+            assert isinstance(rule.action, TransformType)
+            task = self._transformer.submit(
+                path, rule.dest_path, rule.action
+            ).future
+        task.add_done_callback(lambda fut: self._done(path, stat, fut))
+        logger.info(
+            '%s dispatched to %s', path, getattr(rule.action, 'name', rule.action)
+        )
+
+    def _done(
+        self,
+        path: Path,
+        stat: os.stat_result,
+        fut: asyncio.Future,
+    ) -> None:
+        self._dispatched.discard(path)
+        if fut.cancelled():
+            return
+        if fut.exception() is None:
+            self._index.add(path, stat)
+            self._known[path] = (stat.st_size, stat.st_mtime_ns)
+
+    async def _ocr(self, path: Path, dest_path: Path) -> None:
+        assert self._recognizer is not None
+        result = await self._recognizer.recognize([path])
+        async with aiofiles.open(
+            dest_path / (path.stem + '.txt'), 'w', encoding='utf-8'
+        ) as f:
+            await f.write(result[path])
+
+    def _start_inotify(self) -> Optional[_Inotify]:
+        if not self._use_inotify:
+            return None
+        try:
+            inotify = _Inotify()
+        except OSError as e:
+            logger.info(f'inotify unavailable, fall back to polling: {e}')
+            return None
+        try:
+            for directory in self._rules:
+                inotify.add_watch(directory)
+            self._loop.add_reader(inotify.fd, self._on_inotify, inotify)
+        except (OSError, NotImplementedError) as e:
+            logger.info(f'inotify unavailable, fall back to polling: {e}')
+            inotify.close()
+            return None
+        return inotify
+
+    def _on_inotify(self, inotify: _Inotify) -> None:
+        paths, overflow = inotify.read()
+        for path in paths:
+            self._offer(path)
+        if overflow:
+            # 丢失的事件无法恢复，重新扫描所有目录
+            logger.warning('inotify event queue overflowed, rescanning')
+            self._rescan()
+
+    async def run(self) -> None:
+        """开始监控，直到被取消。"""
+
+        for rule in self._rules.values():
+            rule.dest_path.mkdir(parents=True, exist_ok=True)
+        inotify = self._start_inotify()
+        logger.info('watching %d directories', len(self._rules))
+        next_scan = time.monotonic()
+        try:
+            while True:
+                if time.monotonic() >= next_scan:
+                    self._rescan()
+                    next_scan = time.monotonic() + self._poll_interval
+                for path, stat in self._settled():
+                    self._dispatch(path, stat)
+                self._wakeup.clear()
+                timeout = max(next_scan - time.monotonic(), 0)
+                if self._candidates:
+                    timeout = min(timeout, self._settle / 2)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if inotify is not None:
+                self._loop.remove_reader(inotify.fd)
+                inotify.close()
+            self._index.close()
@@ -0,0 +1,18 @@
+import fitz
+import pytest
+
+
+@pytest.fixture
+def make_pdf():
+    """生成每页只有一行页码文字的 PDF。"""
+
+    def make(path, pages, *, size=None, **save_options):
+        width, height = size or (595, 842)
+        pdf = fitz.open()
+        for i in range(pages):
+            pdf.new_page(width=width, height=height).insert_text(
+                (72, 72), f'page {i + 1}'
+            )
+        pdf.save(path, **save_options)
+        pdf.close()
+    return make
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from src.pytools.transform.backend import ConverterPool, FakeBackend
+
+
+class FlakyBackend(FakeBackend):
+    """只能启动一次的后端，模拟重启失败。"""
+
+    def start(self) -> None:
+        if self.started:
+            raise OSError('can not restart')
+        super().start()
+
+
+def _run(pool, coro):
+    async def main():
+        try:
+            return await coro()
+        finally:
+            await pool.close()
+    return asyncio.run(main())
+
+
+def test_restart_only_when_backend_died(tmp_path):
+    backend = FakeBackend()
+    pool = ConverterPool(lambda: backend, 1)
+    docx_file = tmp_path / 'test.docx'
+
+    async def main():
+        # 文件错误不重启转换程序
+        with pytest.raises(FileNotFoundError):
+            await pool.convert(docx_file, tmp_path / 'test.pdf')
+        assert backend.started == 1
+
+        # 转换程序崩溃后重启，仍然抛出原来的异常
+        docx_file.write_bytes(b'')
+        backend.alive = False
+        with pytest.raises(RuntimeError, match='not running'):
+            await pool.convert(docx_file, tmp_path / 'test.pdf')
+        assert backend.started == 2
+        await pool.convert(docx_file, tmp_path / 'test.pdf')
+        assert backend.converted == 1
+    _run(pool, main)
+
+
+def test_failed_restart_removes_backend(tmp_path):
+    backends = []
+
+    def factory():
+        backends.append(FlakyBackend())
+        return backends[-1]
+    pool = ConverterPool(factory, 2)
+    docx_file = tmp_path / 'test.docx'
+    docx_file.write_bytes(b'')
+
+    async def main():
+        await pool.start()
+        for backend in backends:
+            backend.alive = False
+        # 重启失败时保留转换的异常，后端不再放回池中
+        for _ in backends:
+            with pytest.raises(RuntimeError, match='not running'):
+                await pool.convert(docx_file, tmp_path / 'test.pdf')
+        with pytest.raises(RuntimeError, match='no docx2pdf backend'):
+            await asyncio.wait_for(
+                pool.convert(docx_file, tmp_path / 'test.pdf'), 1
+            )
+        assert all(backend.started == 1 for backend in backends)
+    _run(pool, main)
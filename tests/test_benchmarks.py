@@ -0,0 +1,52 @@
+import asyncio
+import zipfile
+
+import fitz
+
+from benchmarks.cases import bench_ocr
+from benchmarks.fixtures import SIZES, make_docx, make_image, make_pdf
+
+
+def _pdf_content(path):
+    with fitz.open(path) as pdf:
+        return [
+            (page.get_text(), [
+                pdf.extract_image(xref)['image']
+                for xref, *_ in page.get_images(full=True)
+            ])
+            for page in pdf
+        ]
+
+
+def _docx_content(path):
+    # 压缩包中记录了写入时间，只比较文档内容
+    with zipfile.ZipFile(path) as docx:
+        return {name: docx.read(name) for name in docx.namelist()}
+
+
+def test_fixtures_are_reproducible(tmp_path):
+    pdfs = tmp_path / 'pdf'
+    pdfs.mkdir()
+    for name, seed in [('a', 1), ('b', 1), ('c', 2)]:
+        make_image(tmp_path / f'{name}.png', (200, 300), seed)
+        make_docx(tmp_path / f'{name}.docx', 5, seed)
+        make_pdf(pdfs / f'{name}.pdf', 3, seed)
+    # 生成 PDF 时使用的临时图片已被删除
+    assert sorted(p.name for p in pdfs.iterdir()) == ['a.pdf', 'b.pdf', 'c.pdf']
+    assert (tmp_path / 'a.png').read_bytes() == (tmp_path / 'b.png').read_bytes()
+    assert (tmp_path / 'a.png').read_bytes() != (tmp_path / 'c.png').read_bytes()
+    assert _docx_content(tmp_path / 'a.docx') == _docx_content(tmp_path / 'b.docx')
+    assert _docx_content(tmp_path / 'a.docx') != _docx_content(tmp_path / 'c.docx')
+    pdf = _pdf_content(pdfs / 'a.pdf')
+    assert len(pdf) == 3 and all(text for text, _ in pdf) and pdf[1][1]
+    assert pdf == _pdf_content(pdfs / 'b.pdf')
+    assert pdf != _pdf_content(pdfs / 'c.pdf')
+
+
+def test_recognizer_against_stand_in_server(tmp_path):
+    ocr = tmp_path / 'ocr'
+    ocr.mkdir()
+    for i in range(6):
+        make_image(ocr / f'{i}.png', (120, 90), i)
+    items, unit = asyncio.run(bench_ocr(tmp_path, tmp_path, SIZES['small']))
+    assert (items, unit) == (6, 'images')
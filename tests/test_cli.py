@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+
+
+def test_cli_never_imports_qt(tmp_path):
+    from PIL import Image
+
+    imgs_dir = tmp_path / 'imgs'
+    imgs_dir.mkdir()
+    for i in range(3):
+        Image.new('RGB', (64, 48), (i * 80, 0, 0)).save(imgs_dir / f'{i}.png')
+    code = (
+        'import sys\n'
+        'from pytools.cli import main\n'
+        f'rc = main(["transform", "img2pdf", {str(imgs_dir)!r}, '
+        f'"-o", {str(tmp_path)!r}, "--jobs", "2"])\n'
+        'assert "PySide6" not in sys.modules\n'
+        'sys.exit(rc)\n'
+    )
+    subprocess.run(
+        [sys.executable, '-c', code],
+        check=True,
+        env={**os.environ, 'PYTHONPATH': str(SRC)},
+    )
+    assert (tmp_path / 'output.pdf').exists()
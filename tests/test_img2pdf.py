@@ -0,0 +1,74 @@
+import asyncio
+from pathlib import Path
+
+import fitz
+from PIL import Image
+
+from src.pytools.transform import Transformer, TransformType, img2pdf
+from src.pytools.transform.core import _natural_key
+
+
+def test_natural_key_orders_numbers_by_value():
+    names = ['page_10.png', 'Page_2.png', 'page_1.jpg', 'page_2b.png', 'a.png']
+    assert sorted(map(Path, names), key=_natural_key) == list(map(Path, [
+        'a.png', 'page_1.jpg', 'Page_2.png', 'page_2b.png', 'page_10.png',
+    ]))
+
+
+def test_img2pdf_orders_and_filters_inputs(tmp_path):
+    imgs = tmp_path / 'imgs'
+    imgs.mkdir()
+    # 用宽度区分页面
+    for width, name in [(30, 'page_10.png'), (20, 'page_2.jpg'),
+                        (10, 'page_1.PNG')]:
+        Image.new('RGB', (width, 40), 'white').save(
+            imgs / name, 'JPEG' if name.endswith('.jpg') else 'PNG'
+        )
+    (imgs / 'notes.txt').write_text('not an image')
+    (imgs / 'folder.png').mkdir()
+    out = tmp_path / 'out'
+    out.mkdir()
+
+    asyncio.run(img2pdf(imgs, out, workers=1))
+    with fitz.open(out / 'output.pdf') as pdf:
+        assert [page.rect.width for page in pdf] == [10, 20, 30]
+
+
+def test_img2pdf_screen_profile_downscales(tmp_path):
+    imgs = tmp_path / 'imgs'
+    imgs.mkdir()
+    Image.new('RGBA', (2000, 1000), (255, 0, 0, 128)).save(imgs / 'a.png')
+
+    asyncio.run(img2pdf(imgs, tmp_path, workers=1, profile='screen'))
+    with fitz.open(tmp_path / 'output.pdf') as pdf:
+        page = pdf[0]
+        assert (page.rect.width, round(page.rect.height)) == (842, 421)
+        (xref, *_), = page.get_images(full=True)
+        info = pdf.extract_image(xref)
+        assert info['ext'] == 'jpeg'
+        assert (info['width'], info['height']) == (1122, 561)
+
+
+def test_concurrent_img2pdf_jobs_share_destination(tmp_path):
+    dirs = []
+    for name, count in [('a', 6), ('b', 4)]:
+        imgs = tmp_path / name
+        imgs.mkdir()
+        for i in range(count):
+            Image.new('RGB', (200, 200), 'white').save(imgs / f'{i}.png')
+        dirs.append(imgs)
+    out = tmp_path / 'out'
+    out.mkdir()
+
+    async def main():
+        transformer = Transformer(concurrency=4)
+        try:
+            await transformer(dirs, out, TransformType.IMG2PDF, workers=1)
+        finally:
+            await transformer.exit()
+    asyncio.run(main())
+
+    # 两个任务依次写入，结果是后完成的任务的完整输出
+    assert [p.name for p in out.iterdir()] == ['output.pdf']
+    with fitz.open(out / 'output.pdf') as pdf:
+        assert pdf.page_count in (6, 4)
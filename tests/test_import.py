@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+# 导入 pytools 的时间预算（秒），不包含解释器启动
+IMPORT_BUDGET = 0.5
+HEAVY_MODULES = (
+    'fitz', 'pymupdf', 'pdf2docx', 'PIL', 'numpy', 'cv2',
+    'aiohttp', 'PySide6', 'qasync', 'win32com', 'pythoncom',
+)
+
+
+def test_import_is_lazy_and_fast():
+    code = (
+        'import json, sys, time\n'
+        't = time.perf_counter()\n'
+        'import pytools, pytools.transform, pytools.OCR, pytools.cli\n'
+        'elapsed = time.perf_counter() - t\n'
+        f'heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n'
+        'print(json.dumps({"elapsed": elapsed, "heavy": heavy}))\n'
+    )
+    # 第一次运行会编译字节码，取第二次的结果
+    for _ in range(2):
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            check=True,
+            capture_output=True,
+            text=True,
+            env={**os.environ, 'PYTHONPATH': str(SRC)},
+        ).stdout
+    result = json.loads(output)
+    assert result['heavy'] == []
+    assert result['elapsed'] < IMPORT_BUDGET
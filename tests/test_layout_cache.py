@@ -0,0 +1,81 @@
+import os
+
+import fitz
+
+from src.pytools.transform.cache import LayoutCache
+from src.pytools.transform.converter import parse_docx_pages
+
+
+def _form_pdf(path, texts):
+    """每页的内容只有一个 Form XObject，文字在 XObject 中。"""
+
+    pdf = fitz.open()
+    for text in texts:
+        src = fitz.open()
+        src.new_page().insert_text((72, 72), text)
+        page = pdf.new_page()
+        page.show_pdf_page(page.rect, src, 0)
+        src.close()
+    pdf.save(path)
+    pdf.close()
+
+
+class CountingCache(LayoutCache):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.hits = 0
+        self.puts = 0
+
+    def get(self, key):
+        data = super().get(key)
+        self.hits += data is not None
+        return data
+
+    def put(self, key, data):
+        self.puts += 1
+        super().put(key, data)
+
+
+def test_key_covers_form_xobjects(tmp_path):
+    cache = LayoutCache(tmp_path / 'cache')
+    keys = []
+    for name, text in [('a', 'Revenue was 100 million'),
+                       ('b', 'Revenue was 900 million'),
+                       ('c', 'Revenue was 100 million')]:
+        _form_pdf(tmp_path / f'{name}.pdf', [text])
+        with fitz.open(tmp_path / f'{name}.pdf') as pdf:
+            assert pdf[0].read_contents().strip().endswith(b'Do Q')
+            keys.append(cache.key(pdf[0], {}))
+    assert keys[0] != keys[1]
+    assert keys[0] == keys[2]
+
+
+def test_unchanged_pages_are_restored(tmp_path):
+    first, revision = tmp_path / 'first.pdf', tmp_path / 'revision.pdf'
+    _form_pdf(first, ['page one', 'page two'])
+    _form_pdf(revision, ['page one', 'page two revised'])
+
+    cache = CountingCache(tmp_path / 'cache')
+    parse_docx_pages(str(first), None, [0, 1], cache)
+    assert (cache.hits, cache.puts) == (0, 2)
+
+    cache = CountingCache(tmp_path / 'cache')
+    pages = parse_docx_pages(str(revision), None, [0, 1], cache)
+    assert (cache.hits, cache.puts) == (1, 1)
+    assert len(pages) == 2
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = LayoutCache(tmp_path / 'cache', max_bytes=1000)
+    keys = [f'{i:02d}' + '0' * 62 for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.put(key, {'data': 'x' * 200})
+        os.utime(cache._path(key), (i, i))
+    cache.get(keys[0])
+    cache.evict()
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[-1]) is not None
+    assert sum(
+        path.stat().st_size for path in (tmp_path / 'cache').glob('*/*.json')
+    ) <= 900
@@ -0,0 +1,52 @@
+import json
+import logging
+import subprocess
+import sys
+
+from src.pytools.logging import JSONFormatter, Progress, logger
+
+
+def test_json_formatter_keeps_extra_fields():
+    record = logger.makeRecord(
+        logger.name, logging.INFO, __file__, 1, 'page %d of %s', (3, 'a.pdf'),
+        None, extra={'job': 7},
+    )
+    data = json.loads(JSONFormatter().format(record))
+    assert data['message'] == 'page 3 of a.pdf'
+    assert data['level'] == 'INFO'
+    assert data['job'] == 7
+
+
+def test_progress_is_rate_limited(caplog):
+    caplog.set_level(logging.INFO, logger=logger.name)
+    progress = Progress('a.pdf', 1000, interval=60)
+    for _ in range(1000):
+        progress.update()
+    progress.close()
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 1
+    assert messages[0].startswith('a.pdf: 1000 pages done in ')
+
+    caplog.clear()
+    progress = Progress('b.pdf', 3, interval=0)
+    for _ in range(3):
+        progress.update()
+    assert [record.getMessage() for record in caplog.records] == [
+        'b.pdf: 1/3 pages done', 'b.pdf: 2/3 pages done', 'b.pdf: 3/3 pages done',
+    ]
+
+
+def test_forked_workers_write_logs():
+    # pytest 替换了 sys.stderr，在独立的进程中检查实际输出
+    code = (
+        'import multiprocessing\n'
+        'from concurrent.futures import ProcessPoolExecutor\n'
+        'from src.pytools.logging import logger\n'
+        'ctx = multiprocessing.get_context("fork")\n'
+        'with ProcessPoolExecutor(1, mp_context=ctx) as pool:\n'
+        '    pool.submit(logger.warning, "message from worker").result()\n'
+    )
+    proc = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+    )
+    assert 'message from worker' in proc.stderr
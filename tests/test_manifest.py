@@ -0,0 +1,78 @@
+import asyncio
+import json
+import os
+
+from src.pytools.transform import pdf2img
+from src.pytools.transform.manifest import PageManifest
+
+
+def _mtimes(directory):
+    return {
+        path.name: path.stat().st_mtime_ns
+        for path in directory.glob('page_*.png')
+    }
+
+
+def _age(directory):
+    """把输出文件的修改时间改到过去，以便分辨哪些页面被重新写入。"""
+
+    for path in directory.glob('page_*.png'):
+        os.utime(path, ns=(0, 0))
+
+
+def test_pdf2img_resumes_from_manifest(tmp_path, make_pdf):
+    pdf_file = tmp_path / 'doc.pdf'
+    make_pdf(pdf_file, 4)
+    out = tmp_path / 'out'
+    pages = out / 'doc'
+
+    def convert(dpi=30, **options):
+        asyncio.run(pdf2img(pdf_file, out, dpi=dpi, workers=1, **options))
+
+    convert()
+    assert sorted(_mtimes(pages)) == [f'page_{i}.png' for i in range(1, 5)]
+
+    # 清单一致时全部跳过
+    _age(pages)
+    convert()
+    assert set(_mtimes(pages).values()) == {0}
+
+    # 被删除和被改动的页面重新渲染
+    (pages / 'page_2.png').unlink()
+    (pages / 'page_3.png').write_bytes(b'changed')
+    convert()
+    mtimes = _mtimes(pages)
+    assert mtimes['page_1.png'] == mtimes['page_4.png'] == 0
+    assert mtimes['page_2.png'] and mtimes['page_3.png']
+    assert (pages / 'page_3.png').read_bytes().startswith(b'\x89PNG')
+
+    # 参数变化时清单过期，全部重新渲染
+    _age(pages)
+    convert(dpi=40)
+    assert 0 not in _mtimes(pages).values()
+    with open(pages / PageManifest.FILENAME, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert json.loads(lines[0])['key']['dpi'] == 40
+    assert len(lines) == 5
+
+    # 不续传时忽略清单
+    _age(pages)
+    convert(dpi=40, resume=False)
+    assert 0 not in _mtimes(pages).values()
+
+
+def test_manifest_ignores_truncated_line(tmp_path):
+    key = {'sha256': 'x', 'dpi': 100}
+    manifest = PageManifest(tmp_path, key)
+    manifest.load()
+    (tmp_path / 'page_1.png').write_bytes(b'one')
+    manifest.record(1, 'page_1.png', b'one')
+    manifest.close()
+    with open(tmp_path / PageManifest.FILENAME, 'a', encoding='utf-8') as f:
+        f.write('{"page": 2, "fi')
+
+    manifest = PageManifest(tmp_path, key)
+    manifest.load()
+    assert manifest.is_done(1)
+    assert not manifest.is_done(2)
+    manifest.close()
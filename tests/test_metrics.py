@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+from PIL import Image
+
+from src.pytools.metrics import Metrics, metrics
+from src.pytools.transform import img2pdf
+
+
+def test_track_emits_events_and_renders_prometheus(tmp_path):
+    registry = Metrics()
+    events = []
+    registry.subscribe(events.append)
+    with registry.track('pdf2img', 'a.pdf') as tracker:
+        tracker.input(100)
+        with tracker.stage('render'):
+            pass
+        tracker.item(40)
+        tracker.item(2)
+    with pytest.raises(ValueError):
+        with registry.track('pdf2img', 'b"ad.pdf'):
+            raise ValueError('broken')
+
+    assert [event['event'] for event in events] == ['done', 'failed']
+    done = events[0]
+    assert done['items'] == 2 and done['bytes_out'] == 42
+    assert 'render' in done['stages']
+    assert registry.value('errors_total', type='pdf2img') == 1
+    text = registry.render()
+    assert '# TYPE pytools_items_total counter' in text
+    assert 'pytools_items_total{type="pdf2img"} 2' in text
+    assert 'pytools_bytes_in_total{type="pdf2img"} 100' in text
+    assert 'pytools_stage_seconds_count{stage="render",type="pdf2img"} 1' in text
+    assert 'pytools_runs_total{result="failed",type="pdf2img"} 1' in text
+    registry.write_textfile(tmp_path / 'pytools.prom')
+    assert (tmp_path / 'pytools.prom').read_text() == text
+    assert [p.name for p in tmp_path.iterdir()] == ['pytools.prom']
+
+
+def test_img2pdf_is_instrumented(tmp_path):
+    imgs = tmp_path / 'imgs'
+    imgs.mkdir()
+    for i in range(3):
+        Image.new('RGB', (64, 64), (i * 80, 0, 0)).save(imgs / f'{i}.png')
+    events = []
+    metrics.subscribe(events.append)
+    try:
+        asyncio.run(img2pdf(imgs, tmp_path, workers=1))
+    finally:
+        metrics.unsubscribe(events.append)
+    event, = events
+    assert event['type'] == 'img2pdf' and event['items'] == 3
+    assert event['bytes_out'] == (tmp_path / 'output.pdf').stat().st_size
+    assert {'read', 'encode', 'write'} <= set(event['stages'])
@@ -0,0 +1,326 @@
+import asyncio
+import threading
+import time
+from base64 import b64decode, b64encode
+from urllib.parse import quote, unquote
+
+from src.pytools.OCR import (
+    AdaptiveLimiter,
+    PreprocessProfile,
+    Recognizer,
+    ResultCache,
+)
+from src.pytools.OCR.preprocess import preprocess_image
+from src.pytools.metrics import Tracker, metrics
+
+
+def _recognizer(concurrency):
+    # 不连接百度的服务，只替换发送请求的部分
+    recognizer = Recognizer.__new__(Recognizer)
+    recognizer._loop = asyncio.get_running_loop()
+    recognizer._limiter = AdaptiveLimiter(concurrency)
+    recognizer._cache = None
+    recognizer._preprocess = None
+    return recognizer
+
+
+def test_recognize_pdf_in_memory(tmp_path, make_pdf):
+    pdf_file = tmp_path / 'scan.pdf'
+    make_pdf(pdf_file, 5)
+
+    async def main():
+        recognizer = _recognizer(2)
+        running = peak = 0
+
+        async def send_data(data, tracker=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.2)
+            running -= 1
+            image = bytes(data['image'])
+            assert image.startswith(b'\xff\xd8')
+            return f'{len(image)} bytes'
+        recognizer._send_data = send_data
+        result = await recognizer.recognize_pdf(pdf_file, dpi=50, workers=1)
+        assert list(result) == [1, 2, 3, 4, 5]
+        assert peak == 2
+    asyncio.run(main())
+    assert list(tmp_path.iterdir()) == [pdf_file]
+
+
+def test_recognize_buffers_stops_after_failure():
+    async def main():
+        recognizer = _recognizer(1)
+        pulled = []
+
+        async def send_data(data, tracker=None):
+            raise RuntimeError('error')
+        recognizer._send_data = send_data
+
+        def buffers():
+            for i in range(10):
+                pulled.append(i)
+                yield i, b'data'
+        try:
+            await recognizer.recognize_buffers(buffers())
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('failure is not raised')
+        assert pulled == [0]
+    asyncio.run(main())
+
+
+def test_slow_request_does_not_stall_other_slots():
+    async def main():
+        recognizer = _recognizer(2)
+
+        async def send_data(data, tracker=None):
+            await asyncio.sleep(float(data['image']))
+            return data['image'].decode()
+        recognizer._send_data = send_data
+        delays = [b'0.5'] + [b'0.05'] * 10
+        start = time.perf_counter()
+        result = await recognizer.recognize_buffers(enumerate(delays))
+        # 分批执行需要 0.5 + 5 * 0.05 秒
+        assert time.perf_counter() - start < 0.65
+        assert list(result) == list(range(11))
+    asyncio.run(main())
+
+
+def test_limiter_backs_off_and_recovers():
+    async def main():
+        limiter = AdaptiveLimiter(8, 2)
+        limiter.throttled()
+        assert limiter.limit == 4
+        # 同一轮中的限流错误只减小一次
+        limiter.observe(0.01)
+        limiter.throttled()
+        assert limiter.limit == 4
+        for _ in range(100):
+            limiter.observe(0.01)
+        assert limiter.limit == 8
+        for _ in range(4):
+            await limiter.acquire()
+        limiter._limit = 4
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        limiter.release()
+        await asyncio.sleep(0)
+        assert waiter.done() and limiter.inflight == 4
+    asyncio.run(main())
+
+
+def test_throttled_requests_are_retried():
+    from benchmarks.server import StandInRecognizer, StandInServer
+
+    async def main():
+        server = StandInServer(latency=0.02, qps_limit=3)
+        await server.start()
+        recognizer = StandInRecognizer(server)
+        try:
+            recognizer.reset_concurrency(8)
+            result = await recognizer.recognize_buffers(
+                (i, b'image') for i in range(40)
+            )
+        finally:
+            await recognizer.exit()
+            await server.stop()
+        assert len(result) == 40
+        assert server.throttled > 0
+        assert server.unsized == 0
+        assert recognizer._limiter.limit < 8
+    asyncio.run(main())
+
+
+def test_result_cache_expires_and_evicts(tmp_path):
+    cache = ResultCache(tmp_path / 'ocr.db', max_bytes=1000, ttl=60)
+    key = cache.key(b'image', 'url', 'image')
+    assert cache.key(b'image', 'url', 'pdf_file') != key
+    assert cache.get(key) is None
+    cache.put(key, 'text')
+    assert cache.get(key) == 'text'
+
+    cache.ttl = 0
+    assert cache.get(key) is None
+    cache.ttl = None
+
+    keys = [cache.key(bytes([i]), 'url') for i in range(10)]
+    for key in keys:
+        cache.put(key, 'x' * 100)
+        cache.get(keys[0])
+    # 最近访问过的结果保留，最久未使用的先被淘汰
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[-1]) is not None
+    cache.close()
+
+    reopened = ResultCache(tmp_path / 'ocr.db', max_bytes=1000)
+    assert reopened.get(keys[-1]) == 'x' * 100
+    reopened.close()
+
+
+def test_recognize_uses_cache(tmp_path):
+    img = tmp_path / 'a.png'
+    img.write_bytes(b'image')
+
+    class ThreadCache(ResultCache):
+        threads = set()
+
+        def get(self, key):
+            self.threads.add(threading.get_ident())
+            return super().get(key)
+
+        def put(self, key, text):
+            self.threads.add(threading.get_ident())
+            super().put(key, text)
+
+    async def main():
+        recognizer = _recognizer(2)
+        recognizer._cache = ThreadCache(tmp_path / 'ocr.db')
+        sent = []
+
+        async def send_data(data, tracker=None):
+            sent.append(data)
+            return 'text'
+        recognizer._send_data = send_data
+        assert await recognizer.recognize([img]) == {img: 'text'}
+        assert await recognizer.recognize([img]) == {img: 'text'}
+        assert await recognizer.recognize_image(b'image') == 'text'
+        assert len(sent) == 1
+        # 缓存的读写不在事件循环所在的线程中进行
+        assert ThreadCache.threads
+        assert threading.get_ident() not in ThreadCache.threads
+        recognizer._cache.close()
+    asyncio.run(main())
+
+
+def test_access_token_is_persisted_and_refreshed(tmp_path):
+    from benchmarks.server import StandInRecognizer, StandInServer
+
+    token_path = tmp_path / 'token.json'
+
+    def recognizer(server):
+        recognizer = StandInRecognizer(server)
+        recognizer.TOKEN_PATH = token_path
+        return recognizer
+
+    async def main():
+        server = StandInServer(latency=0, token_lifetime=1)
+        await server.start()
+        try:
+            first = recognizer(server)
+            assert await first._token == 'stand-in-token-1'
+            await first.exit()
+            assert token_path.stat().st_mode & 0o777 == 0o600
+
+            # 未到刷新时间的 token 直接复用，不再请求
+            second = recognizer(server)
+            assert await second._token == 'stand-in-token-1'
+            assert server.tokens == 1
+            # 有效期过半后在后台刷新
+            await asyncio.sleep(0.7)
+            assert server.tokens == 2
+            assert await second._token == 'stand-in-token-2'
+            await second.exit()
+        finally:
+            await server.stop()
+    asyncio.run(main())
+
+
+def test_upload_is_encoded_in_chunks():
+    async def main():
+        recognizer = _recognizer(1)
+        recognizer.ENCODE_CHUNK = 3 * 5
+        tracker = Tracker(metrics, 'ocr', 'test')
+        data = bytes(range(256)) * 3
+        chunks = [
+            chunk async for chunk in recognizer._form_body(
+                {'image': data, 'url': '', 'language_type': 'CHN_ENG'},
+                tracker,
+            )
+        ]
+        assert max(map(len, chunks)) <= 2 * 20
+        body = b''.join(chunks).decode()
+        assert body == f'image={quote(b64encode(data))}&language_type=CHN_ENG'
+        image = body.split('&')[0].split('=', 1)[1]
+        assert b64decode(unquote(image)) == data
+        # 长度计算与实际编码一致，包括需要补齐的情况
+        for size in range(len(data) - 3, len(data) + 1):
+            form = {'image': data[:size], 'language_type': 'CHN_ENG'}
+            body = b''.join([
+                chunk async for chunk in recognizer._form_body(form, tracker)
+            ])
+            assert recognizer._form_length(form) == len(body)
+    asyncio.run(main())
+
+
+def _screenshot(size=(1200, 800)):
+    from io import BytesIO
+
+    from PIL import Image, ImageDraw
+
+    img = Image.new('RGBA', size, (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((300, 200, 900, 500), outline=(0, 0, 0, 255), width=2)
+    draw.text((320, 220), 'pytools', fill=(0, 0, 0, 255))
+    buf = BytesIO()
+    img.save(buf, 'PNG')
+    return buf.getvalue()
+
+
+def test_preprocess_image():
+    from io import BytesIO
+
+    from PIL import Image
+
+    data = _screenshot()
+    result = preprocess_image(data, PreprocessProfile(max_edge=300))
+    img = Image.open(BytesIO(result))
+    assert img.mode == 'L'
+    # 透明的边框按白色裁掉，剩下的区域再缩小到最长边 300
+    assert max(img.size) == 300
+    assert img.size == (300, 154)
+    assert len(result) < len(data)
+
+    # 照片一类的图片压缩为 JPEG
+    photo = BytesIO()
+    Image.effect_noise((400, 300), 64).convert('RGB').save(photo, 'PNG')
+    img = Image.open(BytesIO(
+        preprocess_image(photo.getvalue(), PreprocessProfile(autocrop=False))
+    ))
+    assert img.format == 'JPEG' and img.size == (400, 300)
+
+    # 不需要缩放、重新编码也不能变小时保持原样
+    tiny = BytesIO()
+    Image.new('L', (20, 20), 255).save(tiny, 'PNG', optimize=True)
+    assert preprocess_image(tiny.getvalue(), PreprocessProfile()) \
+        == tiny.getvalue()
+
+
+def test_recognize_image_with_preprocess(tmp_path):
+    async def main():
+        recognizer = _recognizer(1)
+        recognizer._preprocess = PreprocessProfile(max_edge=300)
+        recognizer._workers = 1
+        recognizer._pool = None
+        recognizer._cache = ResultCache(tmp_path / 'ocr.db')
+        sizes = []
+
+        async def send_data(data, tracker=None):
+            sizes.append(len(data['image']))
+            return 'text'
+        recognizer._send_data = send_data
+        data = _screenshot()
+        assert await recognizer.recognize_image(data) == 'text'
+        assert await recognizer.recognize_image(data) == 'text'
+        assert len(sizes) == 1 and sizes[0] < len(data)
+        # 预处理配置不同时不使用之前的结果
+        recognizer._preprocess = None
+        await recognizer.recognize_image(data)
+        assert sizes[1] == len(data)
+        recognizer._pool.shutdown()
+        recognizer._cache.close()
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import zlib
+from io import BytesIO
+
+import fitz
+import pytest
+from PIL import Image
+
+from src.pytools.transform.pdfwriter import PDFWriter
+
+RED_CMYK = (0, 255, 255, 0)
+
+
+def _jpeg(img):
+    buf = BytesIO()
+    img.save(buf, 'JPEG', quality=95)
+    return buf.getvalue()
+
+
+def _strip_adobe(data):
+    """删除 APP14 段，得到不带 Adobe 标记的 JPEG。"""
+
+    start = data.find(b'\xff\xee')
+    length = int.from_bytes(data[start + 2:start + 4], 'big')
+    return data[:start] + data[start + 2 + length:]
+
+
+def _is_red(pixel):
+    return pixel[0] > 200 and pixel[1] < 60 and pixel[2] < 60
+
+
+def test_writes_all_page_kinds(tmp_path):
+    path = tmp_path / 'output.pdf'
+    # Pillow 保存 CMYK JPEG 时写入 Adobe 标记并反相存储，
+    # 反相的图片去掉标记后存储的就是红色本身的数值
+    adobe = _jpeg(Image.new('CMYK', (8, 8), RED_CMYK))
+    plain = _strip_adobe(_jpeg(Image.new(
+        'CMYK', (8, 8), tuple(255 - v for v in RED_CMYK),
+    )))
+
+    async def main():
+        async with PDFWriter(path) as writer:
+            await writer.add_image_page(
+                _jpeg(Image.new('L', (10, 20), 128)), (10, 20), 'L', 'DCTDecode'
+            )
+            await writer.add_image_page(
+                _jpeg(Image.new('RGB', (8, 8), (255, 0, 0))), (8, 8), 'RGB',
+                'DCTDecode', page_size=(100.0, 50.0),
+            )
+            await writer.add_image_page(
+                adobe, (8, 8), 'CMYK', 'DCTDecode', adobe=True,
+            )
+            await writer.add_image_page(plain, (8, 8), 'CMYK', 'DCTDecode')
+            await writer.add_image_page(
+                zlib.compress(Image.new('RGB', (4, 4), (255, 0, 0)).tobytes()),
+                (4, 4), 'RGB', 'FlateDecode',
+            )
+            assert writer.page_count == 5
+    asyncio.run(main())
+
+    assert [p.name for p in tmp_path.iterdir()] == ['output.pdf']
+    with fitz.open(path) as pdf:
+        assert pdf.page_count == 5
+        assert tuple(pdf[0].rect) == (0, 0, 10, 20)
+        assert tuple(pdf[1].rect) == (0, 0, 100, 50)
+        gray = pdf[0].get_pixmap().pixel(5, 10)
+        assert all(120 <= v <= 136 for v in gray)
+        for page in pdf.pages(1, 5):
+            pixmap = page.get_pixmap()
+            assert _is_red(pixmap.pixel(pixmap.width // 2, pixmap.height // 2))
+
+
+def test_failure_keeps_previous_output(tmp_path):
+    path = tmp_path / 'output.pdf'
+    path.write_bytes(b'previous')
+
+    async def main():
+        async with PDFWriter(path) as writer:
+            await writer.add_image_page(
+                zlib.compress(bytes(16)), (4, 4), 'L', 'FlateDecode',
+            )
+            raise RuntimeError('failed')
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
+    assert path.read_bytes() == b'previous'
+    assert [p.name for p in tmp_path.iterdir()] == ['output.pdf']
+
+
+def test_writers_to_same_target_do_not_collide(tmp_path):
+    path = tmp_path / 'output.pdf'
+
+    async def write(writer, pages):
+        for _ in range(pages):
+            await writer.add_image_page(
+                zlib.compress(bytes(16)), (4, 4), 'L', 'FlateDecode',
+            )
+            await asyncio.sleep(0)
+
+    async def main():
+        first, second = PDFWriter(path), PDFWriter(path)
+        await first.open()
+        await second.open()
+        await asyncio.gather(write(first, 3), write(second, 5))
+        await first.close()
+        with fitz.open(path) as pdf:
+            assert pdf.page_count == 3
+        await second.close()
+    asyncio.run(main())
+
+    with fitz.open(path) as pdf:
+        assert pdf.page_count == 5
+    assert [p.name for p in tmp_path.iterdir()] == ['output.pdf']
+    umask = os.umask(0)
+    os.umask(umask)
+    assert path.stat().st_mode & 0o777 == 0o666 & ~umask
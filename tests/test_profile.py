@@ -0,0 +1,53 @@
+import pytest
+
+from src.pytools.transform.profile import PDF_PROFILES, ImageProfile, PDFProfile
+
+
+@pytest.mark.parametrize('pages, expected', [
+    (None, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
+    ('1-3,5', [0, 1, 2, 4]),
+    ('5, 1-2, 2', [0, 1, 4]),
+    ('8-', [7, 8, 9]),
+    ('-2', [0, 1]),
+    ('9-20', [8, 9]),
+    ('11', []),
+    ('3,,', [2]),
+])
+def test_page_indexes(pages, expected):
+    assert ImageProfile(pages=pages).page_indexes(10) == expected
+
+
+@pytest.mark.parametrize('pages', ['0', '3-1', 'a', '1-x'])
+def test_page_indexes_rejects_invalid_ranges(pages):
+    with pytest.raises(ValueError):
+        ImageProfile(pages=pages).page_indexes(10)
+
+
+def test_image_profile_validation():
+    assert ImageProfile(format='jpeg').suffix == '.jpg'
+    with pytest.raises(ValueError):
+        ImageProfile(format='bmp')
+    with pytest.raises(ValueError):
+        ImageProfile(quality=0)
+
+
+def test_pdf_profile_sizes():
+    archive = PDF_PROFILES['archive']
+    assert archive.max_size((4000, 3000)) is None
+    assert archive.page_size_of((4000, 3000)) is None
+
+    screen = PDF_PROFILES['screen']
+    assert (screen.dpi, screen.quality) == (96, 60)
+    # 竖向图片放入 A4 竖版页面，横向图片放入 A4 横版页面
+    assert screen.max_size((1000, 2000)) == (793, 1122)
+    assert screen.max_size((2000, 1000)) == (1122, 793)
+    width, height = screen.page_size_of((1000, 2000))
+    assert (round(width, 2), height) == (421.0, 842.0)
+    width, height = screen.page_size_of((2000, 1000))
+    assert (width, round(height, 2)) == (842.0, 421.0)
+
+    square = PDFProfile(dpi=72, page_size=(100.0, 200.0))
+    assert square.max_size((50, 50)) == (100, 200)
+    assert square.page_size_of((50, 50)) == (100.0, 100.0)
+    with pytest.raises(ValueError):
+        PDFProfile(quality=101)
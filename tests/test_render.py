@@ -0,0 +1,73 @@
+import asyncio
+import gc
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+import pytest
+
+from src.pytools.transform import core
+from src.pytools.transform.core import render_pages
+
+
+class CountingPool(ProcessPoolExecutor):
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        CountingPool.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def test_render_pages_bounds_inflight_pages(tmp_path, monkeypatch, make_pdf):
+    pdf_file = tmp_path / 'doc.pdf'
+    make_pdf(pdf_file, 12, size=(200, 200))
+    monkeypatch.setattr(core, 'ProcessPoolExecutor', CountingPool)
+    CountingPool.submitted = 0
+
+    async def consume(**options):
+        consumed, peak = [], 0
+        async for index, _ in render_pages(pdf_file, dpi=20, workers=2, **options):
+            # 使用方很慢，渲染端有充足的时间填满队列
+            await asyncio.sleep(0.05)
+            peak = max(peak, CountingPool.submitted - len(consumed))
+            consumed.append(index)
+        return consumed, peak
+
+    consumed, peak = asyncio.run(consume(max_inflight_pages=3))
+    assert consumed == list(range(12))
+    assert peak == 3
+
+    # 内存预算只够两页时，同时在内存中的页数不超过两页
+    CountingPool.submitted = 0
+    page_bytes = int(200 * 20 / 72) ** 2 * 3
+    consumed, peak = asyncio.run(consume(
+        memory_budget=page_bytes * 2, indexes=[1, 3, 5, 7],
+    ))
+    assert consumed == [1, 3, 5, 7]
+    assert peak == 2
+
+
+def test_render_failure_leaves_no_unretrieved_futures(tmp_path, make_pdf):
+    pdf_file = tmp_path / 'encrypted.pdf'
+    make_pdf(
+        pdf_file, 8,
+        encryption=fitz.PDF_ENCRYPT_AES_256,
+        owner_pw='owner',
+        user_pw='user',
+    )
+    errors = []
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: errors.append(context['message'])
+        )
+        with pytest.raises(Exception):
+            async for _ in render_pages(
+                pdf_file, dpi=20, workers=2, indexes=range(8),
+            ):
+                pass
+        # 让已经完成的页面被回收，未读取的异常会在回收时报告
+        await asyncio.sleep(0.5)
+        gc.collect()
+        await asyncio.sleep(0)
+    asyncio.run(main())
+    assert errors == []
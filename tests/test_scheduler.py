@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from src.pytools.transform.scheduler import JobState, Scheduler
+
+
+def test_scheduler_limits_and_priority():
+    async def main():
+        running = {'a': 0, 'b': 0}
+        peak = {'a': 0, 'b': 0, 'total': 0}
+        order = []
+
+        async def runner(job):
+            order.append(job.file)
+            running[job.type] += 1
+            peak[job.type] = max(peak[job.type], running[job.type])
+            peak['total'] = max(peak['total'], sum(running.values()))
+            await asyncio.sleep(0.01)
+            running[job.type] -= 1
+            if job.file == 'fail':
+                raise RuntimeError(job.file)
+        scheduler = Scheduler(runner, concurrency=3, type_limits={'a': 1})
+        jobs = [scheduler.submit(f'a{i}', '.', 'a') for i in range(3)]
+        jobs += [scheduler.submit(f'b{i}', '.', 'b') for i in range(4)]
+        urgent = scheduler.submit('urgent', '.', 'a', priority=10)
+        failed = scheduler.submit('fail', '.', 'b')
+        cancelled = scheduler.submit('cancelled', '.', 'b')
+        assert cancelled.cancel()
+        results = await asyncio.gather(
+            *(job.future for job in jobs + [urgent, failed, cancelled]),
+            return_exceptions=True,
+        )
+        assert peak == {'a': 1, 'b': 2, 'total': 3}
+        # a0 启动后，后提交的高优先级任务先于 a1、a2 执行
+        assert order.index('urgent') < order.index('a1')
+        assert 'cancelled' not in order
+        assert isinstance(results[-2], RuntimeError)
+        assert isinstance(results[-1], asyncio.CancelledError)
+        assert failed.state is JobState.FAILED
+        assert cancelled.state is JobState.CANCELLED
+        assert all(job.state is JobState.DONE for job in jobs + [urgent])
+    asyncio.run(main())
+
+
+def test_cancelling_future_cancels_job():
+    async def main():
+        started, cancelled = [], []
+
+        async def runner(job):
+            started.append(job.file)
+            try:
+                await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                cancelled.append(job.file)
+                raise
+        finished = []
+        scheduler = Scheduler(
+            runner, concurrency=1,
+            on_finish=lambda job: finished.append((job.file, job.state)),
+        )
+        jobs = [scheduler.submit(f'f{i}', '.', 'a') for i in range(3)]
+        waiter = asyncio.gather(*(job.future for job in jobs))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.2)
+        assert started == cancelled == ['f0']
+        assert all(job.state is JobState.CANCELLED for job in jobs)
+        # 运行中的任务在实际停止后才报告
+        assert sorted(finished) == [
+            (f'f{i}', JobState.CANCELLED) for i in range(3)
+        ]
+        assert scheduler.running == scheduler.pending == 0
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.pytools.transform import (
+    FakeBackend,
+    ImageProfile,
+    JobState,
+    JobStore,
+    PDFProfile,
+    Transformer,
+    TransformType,
+)
+
+
+def test_exit_requeues_interrupted_jobs(tmp_path):
+    store = tmp_path / 'jobs.db'
+    for name in ('a', 'b'):
+        (tmp_path / f'{name}.docx').write_bytes(b'docx')
+
+    async def interrupted(submit):
+        transformer = Transformer(
+            docx_backend=lambda: FakeBackend(0.3),
+            docx_workers=1,
+            store=store,
+            max_attempts=1,
+        )
+        if submit:
+            for name in ('a', 'b'):
+                transformer.submit(
+                    tmp_path / f'{name}.docx', tmp_path,
+                    TransformType.DOCX2PDF,
+                )
+        else:
+            assert len(transformer.resume()) == 2
+        await asyncio.sleep(0.1)
+        await transformer.exit()
+
+    # 正常退出不消耗尝试次数，即使只允许尝试一次也能反复恢复
+    for i in range(3):
+        asyncio.run(interrupted(submit=i == 0))
+    db = JobStore(store)
+    records = db.unfinished(max_attempts=1)
+    assert [record.state for record in records] == [JobState.PENDING] * 2
+    assert all(record.attempts == 0 for record in records)
+    db.close()
+
+
+def test_failed_jobs_are_retried_until_max_attempts(tmp_path):
+    store = JobStore(tmp_path / 'jobs.db')
+    id = store.add('a.pdf', 'out', TransformType.PDF2IMG, {})
+    for _ in range(2):
+        store.mark(id, JobState.RUNNING)
+        store.mark(id, JobState.FAILED, 'error')
+        assert [record.id for record in store.unfinished(3)] == [id]
+    store.mark(id, JobState.RUNNING)
+    store.mark(id, JobState.FAILED, 'error')
+    assert store.unfinished(3) == []
+    store.close()
+
+
+def test_options_are_stored_as_json(tmp_path):
+    store = JobStore(tmp_path / 'jobs.db')
+    options = {
+        'dpi': 150,
+        'profile': ImageProfile(format='jpeg', gray=True, pages='1-3'),
+    }
+    store.add('a.pdf', 'out', TransformType.PDF2IMG, options)
+    store.add('dir', 'out', TransformType.IMG2PDF, {
+        'profile': PDFProfile(dpi=96, page_size=(100.0, 200.0)),
+    })
+    with pytest.raises(TypeError):
+        store.add('a.pdf', 'out', TransformType.PDF2DOCX, {'cache': object()})
+    records = store.unfinished(3)
+    assert records[0].options == options
+    assert records[1].options['profile'].page_size == (100.0, 200.0)
+    store.close()
+
+    # 无法解析的参数标记为失败，之后不再被重试
+    db = sqlite3.connect(str(tmp_path / 'jobs.db'))
+    with db:
+        db.execute(
+            'UPDATE jobs SET options = ? WHERE id = ?',
+            (b'\x80not json', records[0].id),
+        )
+    db.close()
+    store = JobStore(tmp_path / 'jobs.db')
+    for _ in range(2):
+        assert [record.id for record in store.unfinished(3)] == [records[1].id]
+    assert store.counts()[JobState.FAILED] == 1
+    store.close()
+    db = sqlite3.connect(str(tmp_path / 'jobs.db'))
+    assert db.execute(
+        'SELECT attempts FROM jobs WHERE id = ?', (records[0].id,)
+    ).fetchone() == (3,)
+    db.close()
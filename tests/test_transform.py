@@ -4,7 +4,8 @@ from functools import wraps
 import asyncio
 
 from src.pytools.transform.core import pdf2img, pdf2docx, img2pdf, docx2pdf
-from src.pytools.transform import Transformer, TransformType
+from src.pytools.transform import JobState, JobStore, Transformer, TransformType
+from src.pytools.transform.backend import ConverterPool, FakeBackend
 
 
 def to_sync(func) -> Callable:
@@ -42,6 +43,56 @@ async def test_docx2pdf():
         (docx_file.parent).resolve()
     )
 
+@to_sync
+async def test_docx2pdf_pool(tmp_path):
+    backends = []
+
+    def factory():
+        backend = FakeBackend()
+        backends.append(backend)
+        return backend
+    docx_files = [tmp_path / f'test_{i}.docx' for i in range(5)]
+    for docx_file in docx_files:
+        docx_file.write_bytes(b'')
+    pool = ConverterPool(factory, 2)
+    try:
+        for docx_file in docx_files:
+            await docx2pdf(docx_file, tmp_path, pool=pool)
+    finally:
+        await pool.close()
+    assert len(backends) == 2
+    assert all(backend.started == 1 for backend in backends)
+    assert sum(backend.converted for backend in backends) == 5
+    assert all(docx_file.with_suffix('.pdf').exists() for docx_file in docx_files)
+
+
+@to_sync
+async def test_transformer_resume(tmp_path):
+    store = tmp_path / 'jobs.db'
+    docx_files = [tmp_path / f'test_{i}.docx' for i in range(3)]
+    for docx_file in docx_files:
+        docx_file.write_bytes(b'')
+    transformer = Transformer(docx_backend=FakeBackend, store=store)
+    for docx_file in docx_files:
+        transformer.submit(docx_file, tmp_path, TransformType.DOCX2PDF)
+    # 任务开始前退出，模拟进程中断
+    await transformer.exit()
+    assert not any(f.with_suffix('.pdf').exists() for f in docx_files)
+
+    transformer = Transformer(docx_backend=FakeBackend, store=store)
+    jobs = transformer.resume()
+    assert [job.file for job in jobs] == [str(f) for f in docx_files]
+    await asyncio.gather(*(job.future for job in jobs))
+    assert transformer.resume() == []
+    await transformer.exit()
+    assert all(f.with_suffix('.pdf').exists() for f in docx_files)
+    store = JobStore(store)
+    try:
+        assert store.counts() == {JobState.DONE: 3}
+    finally:
+        store.close()
+
+
 def test_transformer():
     dest_path = Path('./test_source/total').resolve()
     transformer = Transformer()
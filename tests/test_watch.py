@@ -0,0 +1,126 @@
+import asyncio
+import os
+
+import pytest
+
+from src.pytools.transform import FakeBackend, Transformer, TransformType
+from src.pytools.watch import ProcessedIndex, Watcher, WatchRule
+
+
+@pytest.mark.parametrize('use_inotify', [True, False])
+def test_watcher_processes_settled_files_once(tmp_path, use_inotify):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    dest = tmp_path / 'out'
+    (inbox / 'old.docx').write_bytes(b'old')
+    (inbox / 'ignored.txt').write_text('ignored')
+
+    async def watch(seconds, action=None):
+        backend = FakeBackend()
+        transformer = Transformer(docx_backend=lambda: backend)
+        watcher = Watcher(
+            [WatchRule(inbox, TransformType.DOCX2PDF, dest)],
+            transformer=transformer,
+            index=ProcessedIndex(tmp_path / 'index.db'),
+            settle=0.4,
+            poll_interval=0.1,
+            use_inotify=use_inotify,
+        )
+        task = asyncio.create_task(watcher.run())
+        if action is not None:
+            await action()
+        await asyncio.sleep(seconds)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await transformer.exit()
+        return backend.converted
+
+    async def write_slowly():
+        await asyncio.sleep(0.1)
+        with open(inbox / 'new.docx', 'wb') as f:
+            f.write(b'new')
+            f.flush()
+            # 写入过程中不应该被处理
+            await asyncio.sleep(0.2)
+            assert not (dest / 'new.pdf').exists()
+            f.write(b'more')
+
+    async def main():
+        assert await watch(1.2, write_slowly) == 2
+        assert sorted(p.name for p in dest.iterdir()) == ['new.pdf', 'old.pdf']
+        # 重启后不会重复处理
+        assert await watch(0.5) == 0
+    asyncio.run(main())
+
+
+class OverflowedInotify:
+    def read(self):
+        return [], True
+
+
+def test_watcher_rescans_on_inotify_overflow(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    for name in ('a.docx', 'b.docx', 'done.docx', 'c.txt'):
+        (inbox / name).write_bytes(b'data')
+    index = ProcessedIndex(tmp_path / 'index.db')
+    index.add(inbox / 'done.docx', (inbox / 'done.docx').stat())
+
+    async def main():
+        watcher = Watcher(
+            [WatchRule(inbox, TransformType.DOCX2PDF, tmp_path / 'out')],
+            transformer=Transformer(docx_backend=FakeBackend),
+            index=index,
+        )
+        # 溢出时丢失了所有事件，仍然能通过扫描发现新文件
+        watcher._on_inotify(OverflowedInotify())
+        assert sorted(p.name for p in watcher._candidates) == ['a.docx', 'b.docx']
+        assert list(watcher._known) == [inbox / 'done.docx']
+    asyncio.run(main())
+    index.close()
+
+
+class SilentInotify:
+    """网络共享目录上的 inotify：监控成功，但收不到其他机器写入的事件。"""
+
+    def __init__(self):
+        self.fd, self._w = os.pipe()
+
+    def read(self):
+        return [], False
+
+    def close(self):
+        os.close(self.fd)
+        os.close(self._w)
+
+
+def test_watcher_rescans_periodically_without_events(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    dest = tmp_path / 'out'
+
+    async def main():
+        backend = FakeBackend()
+        transformer = Transformer(docx_backend=lambda: backend)
+        watcher = Watcher(
+            [WatchRule(inbox, TransformType.DOCX2PDF, dest)],
+            transformer=transformer,
+            index=ProcessedIndex(tmp_path / 'index.db'),
+            settle=0.1,
+            poll_interval=0.2,
+        )
+        watcher._start_inotify = SilentInotify
+        task = asyncio.create_task(watcher.run())
+        await asyncio.sleep(0.1)
+        # 目录的修改时间不变时也会被扫描到
+        mtime = inbox.stat().st_mtime_ns
+        (inbox / 'remote.docx').write_bytes(b'remote')
+        os.utime(inbox, ns=(mtime, mtime))
+        await asyncio.sleep(0.8)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await transformer.exit()
+        assert backend.converted == 1
+    asyncio.run(main())